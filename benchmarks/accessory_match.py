@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Accessory filter micro-benchmark: the old per-keyword `in` loops vs TermMatcher.
+
+Titles come from samples/products.csv. The legacy functions below are copies of
+the loops the stores used before textmatch (Jumia re-normalized its keyword
+lists on every call; the others scanned one keyword at a time).
+
+Run examples:
+  python benchmarks/accessory_match.py
+  python benchmarks/accessory_match.py --repeat 200
+"""
+import os, re, sys, time, argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scrapers"))
+
+import textmatch  # noqa: E402
+from textmatch import TermMatcher, normalize_text  # noqa: E402
+from fixtures import sample_products  # noqa: E402
+
+# Jumia's keyword lists (the largest of the stores)
+KEYWORDS_AR = [
+    "جراب", "كفر", "حماية", "غطاء", "لاصقة", "شاشة", "واقي",
+    "سماعة", "سماعات", "قلم", "عدسة", "حافظة", "غطى", "كاميرا",
+    "شاحن", "كابل", "سلك", "بطارية", "حقيبة", "محفظة", "جلد", "سيليكون",
+    "اسكرين", "اسكرين بروتيكتور", "اسكرين جلاس", "باور بانك", "سكرين",
+    "ايفون 13 وايفون 14", "ايفون 13 برو ماكس",
+]
+KEYWORDS_EN = [
+    "case", "cover", "screen", "protector", "glass", "accessory", "charger",
+    "cable", "headset", "silicone", "bumper", "shell", "skin", "sleeve", "lens", "wallet",
+    "battery", "bag", "pouch", "leather", "shockproof", "tempered glass",
+    "power bank", "powerbank", "headphones", "earphones", "earbuds", "stylus", "stand",
+    "tripod", "car mount", "holder", "adapter", "dock", "cradle", "wristband", "strap",
+    "indicator", "remote", "keyboard", "mouse", "screen protector",
+    "wireless charger", "fast charger", "car charger", "usb cable", "lightning cable",
+    "type-c cable", "aux cable", "hdmi cable", "otg cable", "audio cable", "charging dock",
+]
+
+
+def normalize_arabic(text):
+    text = re.sub(r"[إأآا]", "ا", text)
+    text = re.sub(r"[ى]", "ي", text)
+    text = re.sub(r"[ة]", "ه", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+def legacy_jumia(title):
+    title_norm = normalize_arabic(title).lower()
+    title_lower = title.lower()
+    normalized_keywords_ar = [normalize_arabic(word).lower() for word in KEYWORDS_AR]
+    normalized_keywords_en = [word.lower() for word in KEYWORDS_EN]
+    for word in normalized_keywords_ar:
+        if word in title_norm:
+            return True
+    for word in normalized_keywords_en:
+        if word in title_lower:
+            return True
+    return False
+
+
+_PRE_AR = [normalize_arabic(w).lower() for w in KEYWORDS_AR]
+_PRE_EN = [w.lower() for w in KEYWORDS_EN]
+
+
+def legacy_loop(title):
+    # what the other stores did: normalize the title, then one `in` per keyword
+    t = normalize_arabic(title).lower()
+    return any(w in t for w in _PRE_AR + _PRE_EN)
+
+
+def timed(fn, titles, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        hits = sum(1 for t in titles if fn(t))
+    return (time.perf_counter() - t0) / (repeat * len(titles)) * 1e6, hits
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark accessory keyword matching.")
+    ap.add_argument("--repeat", type=int, default=50)
+    args = ap.parse_args()
+
+    titles = [p["title"] for p in sample_products()]
+    matcher = TermMatcher(KEYWORDS_AR + KEYWORDS_EN)
+    py_matcher = TermMatcher(KEYWORDS_AR + KEYWORDS_EN)
+    py_matcher._auto = textmatch._PyAutomaton(py_matcher.terms)
+
+    cases = [
+        ("legacy jumia (re-normalizes keywords)", legacy_jumia),
+        ("legacy loop (one `in` per keyword)", legacy_loop),
+        ("TermMatcher" + (" (pyahocorasick)" if textmatch.ahocorasick else " (pure Python)"), matcher.matches),
+        ("TermMatcher (pure Python automaton)", py_matcher.matches),
+        ("TermMatcher, title pre-normalized", lambda t, n=normalize_text: matcher.matches(n(t), normalized=True)),
+    ]
+    print(f"{len(titles)} titles x {args.repeat} runs, {len(matcher)} keywords\n")
+    base = None
+    for name, fn in cases:
+        us, hits = timed(fn, titles, args.repeat)
+        base = base or us
+        print(f"{name:<44}{us:>8.2f} us/title  {hits:>4} accessories  {base / us:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Title parsing throughput: the per-store brand/model/suffix functions vs extraction.extract().
+
+Titles come from samples/products.csv. The legacy_* functions below are copies
+of what Amazon, Noon and 2B ran before the shared engine (2B on its
+normalize_for_parse() output). The engine is timed cold (cache cleared every
+pass) and warm (titles seen before, as on a second keyword).
+
+--check instead verifies the engine: the regression CASES below, the DISTINCT
+title pairs that must not share a canonical_id (matching.py), and Amazon /
+Noon columns equal to the legacy functions on every sample title (apart from the
+"ابل" inside "قابل" fix).
+
+Run examples:
+  python benchmarks/extraction.py
+  python benchmarks/extraction.py --repeat 50
+  python benchmarks/extraction.py --check
+"""
+import os, re, sys, time, argparse
+from typing import Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scrapers"))
+
+import extraction  # noqa: E402
+import textnorm  # noqa: E402
+from extraction import extract, amazon_columns, noon_columns  # noqa: E402
+from fixtures import sample_products  # noqa: E402
+from matching import canonical_id, canonical_key  # noqa: E402
+
+SERIES_TO_BRAND = {"redmi": "xiaomi", "poco": "xiaomi", "galaxy": "samsung"}
+ARABIC_DIGITS = str.maketrans("٠١٢٣٤٥٦٧٨٩", "0123456789")
+AR_EN_MAP = {
+    "ايفون": "iphone", "ابل": "apple", "برو ماكس": "Pro Max", "برو": "Pro", "ماكس": "Max",
+    "بلس": "Plus", "الترا": "Ultra", "اير": "Air", "ميني": "Mini", "مينى": "Mini",
+    "جيجا بايت": "GB", "جيجابايت": "GB", "رام": "RAM", "ثنائي الشريحة": "Dual SIM",
+}
+
+
+def normalize_arabic(text):
+    text = re.sub(r"[إأآا]", "ا", text)
+    text = re.sub(r"[ى]", "ي", text)
+    text = re.sub(r"[ة]", "ه", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+def normalize_for_parse(raw):
+    t = (raw or "").translate(ARABIC_DIGITS)
+    for ar, en in AR_EN_MAP.items():
+        t = re.sub(ar, en, t, flags=re.IGNORECASE)
+    t = t.replace("–", "-").replace("—", "-")
+    return re.sub(r"\s+", " ", t).strip()
+
+
+# ---------------- Legacy: Amazon ----------------
+
+def amazon_extract_brand_or_model(title):
+    title_norm = normalize_arabic(title.lower())
+    brand_map = {
+        "ايفون": "ايفون", "آيفون": "ايفون", "apple": "Apple", "ابل": "Apple",
+        "سامسونج": "سامسونج", "samsung": "Samsung",
+        "ريلمي": "ريلمي", "realme": "Realme",
+        "هواوي": "هواوي", "huawei": "Huawei",
+        "شاومي": "شاومي", "xiaomi": "Xiaomi",
+        "اوبو": "اوبو", "oppo": "Oppo",
+        "فيفو": "فيفو", "vivo": "Vivo",
+        "نوكيا": "نوكيا", "nokia": "Nokia",
+        "سوني": "سوني", "sony": "Sony",
+        "جوجل": "جوجل", "google": "Google Pixel",
+        "موتورولا": "موتورولا", "motorola": "Motorola",
+        "ون بلس": "ون بلس", "oneplus": "OnePlus",
+        "ال جي": "ال جي", "lg": "LG",
+        "بوكو": "بوكو", "poco": "Poco"
+    }
+
+    for keyword, brand in brand_map.items():
+        if keyword in title_norm:
+            return brand
+    return "Unknown"
+
+def amazon_extract_model_and_suffix(title):
+    title = normalize_arabic(title)
+    suffix = ""
+
+    # سuffix = "Pro" or "برو"
+    suffix_match = re.search(r"\b(pro|برو)\b", title, re.IGNORECASE)
+    if suffix_match:
+        suffix = suffix_match.group(1).capitalize()
+
+    # Samsung model like "ايه 55" -> A55
+    match = re.search(r"\bايه\s*(\d{1,3})\b", title)
+    if match:
+        return f"A{match.group(1)}", suffix
+
+    # Redmi "نوت 13" → Note 13
+    if "ريدمي" in title and "نوت" in title:
+        note_match = re.search(r"نوت\s*(\d{1,3})", title)
+        if note_match:
+            return f"Note{note_match.group(1)}", "نوت" if not suffix else suffix
+
+    # General models like "S23", "C53", "13 Pro"
+    match = re.search(r"\b([a-zA-Z]{1,2}\d{1,3}[a-zA-Z+]{0,4})\b", title, re.IGNORECASE)
+    if match:
+        return match.group(1).upper(), suffix
+
+    return None, suffix
+
+
+# ---------------- Legacy: Noon ----------------
+
+def noon_extract_brand_or_model(title):
+    title_norm = normalize_arabic(title.lower())
+
+    if "ايباد" in title_norm or "ipad" in title_norm:
+        return "ايباد"
+
+    if ("ايفون" in title_norm or "iphone" in title_norm) and "كابل" not in title_norm:
+        return "ايفون"
+
+    if "ابل" in title_norm and ("iphone" in title_norm or "ايفون" in title_norm):
+        return "ايفون"
+
+    if "شاومي" in title_norm and ("ريدمي" in title_norm or "redmi" in title_norm):
+        return "ريدمي"
+
+    if "شاومي" in title_norm and ("poco" in title_norm or "بوكو" in title_norm):
+        return "بوكو"
+
+    if "بوكو" in title_norm or "poco" in title_norm:
+        return "بوكو"
+
+    if "ريدمي" in title_norm or "redmi" in title_norm:
+        return "ريدمي"
+
+    if "ريلمي" in title_norm or "ريل مي" in title_norm or "realme" in title_norm:
+        return "ريلمي"
+
+    if re.search(r"\bابل\b", title_norm) and "كابل" not in title_norm:
+        return "Apple"
+
+    brand_map = {
+        "سامسونج": "سامسونج", "samsung": "Samsung",
+        "هواوي": "هواوي", "huawei": "Huawei",
+        "شاومي": "شاومي", "xiaomi": "Xiaomi",
+        "اوبو": "اوبو", "oppo": "Oppo",
+        "فيفو": "فيفو", "vivo": "Vivo",
+        "نوكيا": "نوكيا", "nokia": "Nokia",
+        "سوني": "سوني", "sony": "Sony",
+        "جوجل": "جوجل", "google": "Google Pixel",
+        "موتورولا": "موتورولا", "motorola": "Motorola",
+        "ون بلس": "ون بلس", "oneplus": "OnePlus",
+        "ال جي": "ال جي", "lg": "LG"
+    }
+
+    for keyword, brand in brand_map.items():
+        if keyword in title_norm:
+            return brand
+
+    return "Unknown"
+
+def noon_extract_model_and_suffix(title):
+    title = normalize_arabic(title)
+    suffix = ""
+
+    suffix_match = re.search(r"\b(pro\+?|برو)\b", title, re.IGNORECASE)
+    if suffix_match:
+        suffix = suffix_match.group(1).capitalize()
+
+    model_match = re.search(r"(?:ريلمي|realme).*?(\d{2})", title, re.IGNORECASE)
+    if model_match:
+        model = model_match.group(1)
+        return model, suffix
+
+    fallback = re.search(r"\b([a-zA-Z]{1,2}\d{1,3}[a-zA-Z+]{0,4})\b", title, re.IGNORECASE)
+    if fallback:
+        return fallback.group(1).upper(), suffix
+
+    return None, suffix
+
+
+# ---------------- Legacy: 2B ----------------
+
+def twob_pick_brand_series_model(t: str) -> Tuple[str, Optional[str], str]:
+    tl = f" {t.lower()} "
+    brand = None
+    series = None
+
+    for b in ["iphone","samsung","xiaomi","redmi","poco","oppo","reno","realme","huawei","honor","vivo","nokia","oneplus","motorola","infinix","tecno","sony","galaxy"]:
+        if f" {b} " in tl:
+            if b in SERIES_TO_BRAND:
+                series = b
+                brand = SERIES_TO_BRAND[b]
+            else:
+                brand = b
+            break
+
+    # iPhone: keep the generation number
+    if " iphone " in tl:
+        m = re.search(r"iphone\s+(\d{1,2}[eE]?)\s*(pro\s*max|pro|plus|ultra|air|mini)?", t, re.I)
+        if m:
+            num = m.group(1)
+            suf = (m.group(2) or "").strip()
+            model = f"{num} {suf}".strip()
+            model = re.sub(r"\s+", " ", model).title()
+            return ("apple", None, model)
+        m2 = re.search(r"iphone\s+(air|mini)", t, re.I)
+        if m2:
+            return ("apple", None, m2.group(1).title())
+        return ("apple", None, "")
+
+    if " galaxy " in tl:
+        m = re.search(r"galaxy\s+([a-z0-9]+(?:\s?[a-z0-9]+)*)", t, re.I)
+        if m:
+            return ("samsung", "galaxy", m.group(1).strip())
+
+    for fam in ["redmi","poco","xiaomi"]:
+        if f" {fam} " in tl:
+            m = re.search(rf"{fam}\s+([a-z0-9\- ]+)", t, re.I)
+            if m:
+                b = SERIES_TO_BRAND.get(fam, fam)
+                ser = fam if fam in SERIES_TO_BRAND else None
+                return (b, ser, m.group(1).strip())
+
+    if brand:
+        m = re.search(rf"{brand}\s+([a-z0-9\- ]+)", t, re.I)
+        if m:
+            return (brand, None, m.group(1).strip())
+
+    return (brand or "", None, "")
+
+
+def twob_parse_suffix(t: str) -> str:
+    tt = t.replace("جيجا بايت","GB").replace("جيجابايت","GB")
+    caps = re.findall(r"(\d{2,4}\s?GB|\d{1,2}\s?TB)", tt, re.I)
+    ram  = re.findall(r"(\d{1,2})\s?GB\s?RAM", tt, re.I) or re.findall(r"RAM\s?(\d{1,2})\s?GB", tt, re.I)
+    flags = []
+    if re.search(r"\b5G\b", tt, re.I):
+        flags.append("5G")
+    if re.search(r"Dual[\s-]?SIM|Dual\s?\/\s?Sim|Dual Sim|ثنائي الشريحة", tt, re.I):
+        flags.append("Dual SIM")
+    parts = []
+    if ram:
+        parts.append(f"{max(int(x) for x in ram)}GB RAM")
+    if caps:
+        def cap_to_num(x):
+            x = x.lower().replace(" ", "")
+            return (int(x[:-2]) * 1024) if x.endswith("tb") else int(x[:-2])
+        parts.append(sorted(caps, key=cap_to_num, reverse=True)[0].upper().replace(" ", ""))
+    parts.extend(flags)
+    return " / ".join(parts)
+
+
+# ---------------- Regression cases ----------------
+
+# title -> (full_model, suffix) from extract()
+CASES = [
+    ("Infinix Hot 40 Pro 8GB 256GB", "Hot 40 Pro", "8GB RAM / 256GB"),
+    ("هاتف انفنيكس هوت 40 برو 256 جيجا", "Hot 40 Pro", "256GB"),
+    ("Huawei Nova 11i 8GB 128GB", "Nova 11I", "8GB RAM / 128GB"),
+    ("Honor Magic 6 Pro 5G", "Magic 6 Pro", "5G"),
+    ("Tecno Camon 20 Pro", "Camon 20 Pro", ""),
+    ("Tecno Spark 20 Pro 8GB+256GB", "Spark 20 Pro", "8GB RAM / 256GB"),
+    ("Motorola Edge 40 Neo", "Edge 40 Neo", ""),
+    ("OnePlus Nord CE 3 Lite", "Nord CE 3 Lite", ""),
+    ("Honor X9b 5G 12GB 256GB", "X9B", "12GB RAM / 256GB / 5G"),
+    ("Samsung Galaxy S24 Ultra 12GB 1TB", "S24 Ultra", "12GB RAM / 1TB"),
+    ("Xiaomi Redmi Note 13 Pro 8GB/256GB", "Note 13 Pro", "8GB RAM / 256GB"),
+    ("Samsung Galaxy A55 8GB RAM 256GB", "A55", "8GB RAM / 256GB"),
+    ("iPhone 15 Pro Max 256GB", "15 Pro Max", "256GB"),
+    ("iPhone 15 128GB 256GB", "15", "256GB"),
+    ("Oppo Reno 11 F 5G", "11F", "5G"),
+    ("Xiaomi 14 T Pro 512GB", "14T Pro", "512GB"),
+    ("Samsung Galaxy Tab S9", "Tab S9", ""),
+    ("Samsung Galaxy Tab S9 FE 128GB", "Tab S9 FE", "128GB"),
+    ("Apple iPad 11 128GB WiFi", "iPad 11", "128GB"),
+    ("Huawei MatePad 11 128GB", "MatePad 11", "128GB"),
+]
+
+# different devices (tablet vs phone) whose keys once collided
+DISTINCT = [
+    ("Apple iPad 11 128GB WiFi", "Apple iPhone 11 128GB"),
+    ("ابل ايباد 10 64 جيجابايت", "ايفون 10 64 جيجا"),
+    ("Galaxy Tab S9 256GB", "Galaxy S9 256GB"),
+    ("Samsung Galaxy Tab A9 64GB", "Samsung Galaxy A9 64GB"),
+]
+
+
+def check(titles) -> int:
+    failures = 0
+    for title, model, suffix in CASES:
+        spec = extract(title)
+        if (spec.full_model, spec.suffix) != (model, suffix):
+            failures += 1
+            print(f"FAIL {title!r}: {(spec.full_model, spec.suffix)} != {(model, suffix)}")
+    for a, b in DISTINCT:
+        ka, kb = canonical_key(extract(a)), canonical_key(extract(b))
+        if ka is None or kb is None or canonical_id(ka) == canonical_id(kb):
+            failures += 1
+            print(f"FAIL {a!r} / {b!r}: {ka and canonical_id(ka)} vs {kb and canonical_id(kb)}")
+    for title in titles:
+        if "قابل" in title:
+            continue
+        amazon = (amazon_extract_brand_or_model(title),) + tuple(amazon_extract_model_and_suffix(title))
+        norm = textnorm.normalize_arabic(title)
+        noon = (noon_extract_brand_or_model(norm),) + tuple(noon_extract_model_and_suffix(norm))
+        for store, want, got in (("amazon", amazon, amazon_columns(title)), ("noon", noon, noon_columns(norm))):
+            if want != got:
+                failures += 1
+                print(f"FAIL {store} {title!r}: {got} != {want}")
+    print(f"{len(CASES)} cases, {len(DISTINCT)} pairs, {len(titles)} titles x 2 stores: {failures} failures")
+    return failures
+
+
+def legacy_amazon(title):
+    return amazon_extract_brand_or_model(title), amazon_extract_model_and_suffix(title)
+
+
+def legacy_noon(title):
+    return noon_extract_brand_or_model(title), noon_extract_model_and_suffix(title)
+
+
+def legacy_twob(norm):
+    return twob_pick_brand_series_model(norm), twob_parse_suffix(norm)
+
+
+def engine_store_columns(title):
+    return amazon_columns(title), noon_columns(title), extract(title).suffix
+
+
+def clear_caches():
+    extract.cache_clear()
+    amazon_columns.cache_clear()
+    noon_columns.cache_clear()
+    textnorm.normalize_arabic.cache_clear()
+    textnorm.normalize_lower.cache_clear()
+    extraction._ALIAS._cached.cache_clear()
+
+
+def timed(fn, titles, repeat, clear=False):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        if clear:
+            clear_caches()
+        for t in titles:
+            fn(t)
+    elapsed = time.perf_counter() - t0
+    return repeat * len(titles) / elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark title brand/model/suffix extraction.")
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--check", action="store_true", help="verify the engine instead of timing it")
+    args = ap.parse_args()
+
+    titles = [p["title"] for p in sample_products()]
+    if args.check:
+        sys.exit(1 if check(titles) else 0)
+    norms = [normalize_for_parse(t) for t in titles]
+
+    rows = [
+        ("legacy Amazon", lambda: timed(legacy_amazon, titles, args.repeat)),
+        ("legacy Noon", lambda: timed(legacy_noon, titles, args.repeat)),
+        ("legacy 2B (pre-normalized)", lambda: timed(legacy_twob, norms, args.repeat)),
+        ("engine, cold cache", lambda: timed(engine_store_columns, titles, args.repeat, clear=True)),
+        ("engine, warm cache", lambda: timed(engine_store_columns, titles, args.repeat)),
+    ]
+    print(f"{len(titles)} titles x {args.repeat} runs\n")
+    for name, run in rows:
+        print(f"{name:<30}{run():>12,.0f} titles/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+HTML fixtures for the benchmarks.
+
+Real pages saved as benchmarks/fixtures/<store>-<anything>.html are used when
+present (store = amazon | noon | jumia | 2b), e.g.
+
+  curl -sL -A "Mozilla/5.0" "https://www.jumia.com.eg/ar/catalog/?q=samsung" \
+       -o benchmarks/fixtures/jumia-samsung.html
+
+Otherwise synthetic result pages are built from samples/products.csv with each
+store's product-card markup plus the kind of head/script/nav bulk real pages
+carry, so the parsers have a realistic amount of non-product HTML to get through.
+"""
+import os, csv, glob, html
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+SAMPLES_CSV = os.path.join(ROOT, "samples", "products.csv")
+
+STORES = ["amazon", "noon", "jumia", "2b"]
+
+
+def sample_products() -> List[Dict[str, str]]:
+    with open(SAMPLES_CSV, encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def _card(store: str, i: int, p: Dict[str, str]) -> str:
+    title = html.escape(p["title"])
+    price = html.escape(f"{float(p['price'] or 0):,.0f}")
+    link = html.escape(p.get("link") or f"/product/{i}")
+    if store == "amazon":
+        return (f'<div data-component-type="s-search-result" data-asin="B0{i:08d}" class="s-result-item s-asin">'
+                f'<div class="sg-col-inner"><span class="a-declarative"><img class="s-image" src="/i/{i}.jpg" alt="{title}"></span>'
+                f'<a class="a-link-normal s-no-outline" href="/dp/B0{i:08d}/ref=sr_1_{i}?keywords=x"><h2 class="a-size-mini">'
+                f'<span class="a-size-base-plus a-color-base a-text-normal">{title}</span></h2></a>'
+                f'<div class="a-row"><i class="a-icon a-icon-star-small"><span class="a-icon-alt">4.5</span></i></div>'
+                f'<span class="a-price"><span class="a-offscreen">EGP{price}</span><span class="a-price-whole">{price}.</span>'
+                f'<span class="a-price-fraction">00</span></span><div class="a-row a-size-base">Delivery tomorrow</div></div></div>')
+    if store == "noon":
+        return (f'<div class="ProductBoxVertical_wrapper__xPj_f"><a href="/egypt-ar/p-{i}/p/"><div class="ProductImageCarousel_wrapper">'
+                f'<img src="/i/{i}.jpg" alt=""></div><div class="ProductDetailsSection_wrapper__yLBrw">'
+                f'<h2 class="ProductDetailsSection_title__JorAV" title="{title}">{title}</h2>'
+                f'<div class="Price_priceWrapper"><strong class="Price_amount__2sXa7">{price}</strong>'
+                f'<span class="Price_currency">جنيه</span></div></div></a></div>')
+    if store == "jumia":
+        return (f'<article class="prd _fb col c-prd"><a class="core" href="{link}" data-gtm-id="{i}">'
+                f'<div class="img-c"><img class="img" data-src="/i/{i}.jpg" alt=""></div><div class="info">'
+                f'<h3 class="name">{title}</h3><div class="prc">{price} جنيه</div>'
+                f'<div class="rev"><div class="stars _s">4.4 out of 5</div></div></div></a></article>')
+    return (f'<li class="item product product-item"><div class="product-item-info">'
+            f'<a class="product photo product-item-photo" href="{link}"><img class="product-image-photo" src="/i/{i}.jpg"></a>'
+            f'<div class="product details product-item-details"><strong class="product name product-item-name">'
+            f'<a class="product-item-link" href="{link}">{title}</a></strong>'
+            f'<div class="price-box price-final_price" data-role="priceBox"><span class="price-container">'
+            f'<span data-price-type="finalPrice" class="price-wrapper"><span class="price">{price} EGP</span></span>'
+            f'</span></div></div></div></li>')
+
+
+def _page(store: str, cards: List[str]) -> str:
+    scripts = "".join(f'<script>window.__cfg{i} = {{"k": "{"x" * 400}", "n": {i}}};</script>' for i in range(40))
+    styles = "".join(f'<link rel="stylesheet" href="/static/{i}.css">' for i in range(20))
+    nav = "".join(f'<li class="menu-item"><a href="/c/{i}"><span>Category {i}</span></a>'
+                  f'<ul class="submenu">{"".join(f"<li><a href=/c/{i}/{j}>Sub {j}</a></li>" for j in range(12))}</ul></li>'
+                  for i in range(25))
+    footer = "".join(f'<div class="footer-col"><h4>Section {i}</h4><p>{"lorem ipsum " * 30}</p></div>' for i in range(8))
+    grid = ('<ol class="products list items product-items">' + "".join(cards) + "</ol>") if store == "2b" \
+        else '<div class="s-main-slot grid">' + "".join(cards) + "</div>"
+    return (f'<!DOCTYPE html><html lang="ar" dir="rtl"><head><meta charset="utf-8"><title>{store}</title>'
+            f'{styles}{scripts}</head><body><header><nav><ul class="menu">{nav}</ul></nav></header>'
+            f'<main><div class="search-results">{grid}</div></main><footer>{footer}</footer></body></html>')
+
+
+def synthetic_pages(per_page: int = 48) -> List[Tuple[str, str, str]]:
+    """(store, name, html) per store, filled with sample products."""
+    products = sample_products()
+    out = []
+    for store in STORES:
+        rows = [products[i % len(products)] for i in range(per_page)]
+        out.append((store, f"{store}-synthetic", _page(store, [_card(store, i, p) for i, p in enumerate(rows)])))
+    return out
+
+
+def saved_pages() -> List[Tuple[str, str, str]]:
+    out = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        store = name.split("-", 1)[0].lower()
+        if store in STORES:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                out.append((store, name, f.read()))
+    return out
+
+
+def load_pages() -> List[Tuple[str, str, str]]:
+    """Saved fixtures if any, else synthetic pages."""
+    return saved_pages() or synthetic_pages()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cross-store matching: blocking index (matching.ProductMatcher) vs pairwise title
+comparison (Jaccard of the new title against every title already known).
+
+The known catalog is grown synthetically from samples/products.csv (the same
+titles with other model numbers and capacities) so the effect of catalog size is
+visible; the sample titles are then matched against it. The index runs on a
+throwaway SQLite file.
+
+Run examples:
+  python benchmarks/matching.py
+  python benchmarks/matching.py --sizes 1000 10000 --repeat 3
+"""
+import os, re, sys, time, argparse, tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scrapers"))
+
+from matching import ProductMatcher, jaccard, title_tokens  # noqa: E402
+from fixtures import sample_products  # noqa: E402
+
+CAPACITIES = ["64", "128", "256", "512"]
+
+
+def catalog(titles, size):
+    """`size` distinct titles: sample titles with shifted model numbers / capacities."""
+    out, i = [], 0
+    while len(out) < size:
+        t = titles[i % len(titles)]
+        shift = i // len(titles)
+        t = re.sub(r"\b(\d{1,2})\b", lambda m: str(int(m.group(1)) + shift), t, count=1)
+        t = re.sub(r"\b(64|128|256|512)\b", CAPACITIES[shift % len(CAPACITIES)], t)
+        out.append(t)
+        i += 1
+    return out
+
+
+def pairwise(known_tokens, title, threshold=0.5):
+    tokens = title_tokens(title)
+    best, best_score = None, threshold
+    for i, kt in enumerate(known_tokens):
+        score = jaccard(tokens, kt)
+        if score >= best_score:
+            best, best_score = i, score
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the product matching index.")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 8000])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    titles = [p["title"] for p in sample_products()]
+    print(f"{len(titles)} sample titles matched against catalogs of {args.sizes}\n")
+    print(f"{'catalog':>8}{'products':>10}{'pairwise us/row':>18}{'index us/row':>15}{'speedup':>9}")
+    for size in args.sizes:
+        known = catalog(titles, size)
+        with tempfile.TemporaryDirectory() as d:
+            matcher = ProductMatcher(os.path.join(d, "match.sqlite"))
+            matcher.assign([{"title": t} for t in known])
+
+            t0 = time.perf_counter()
+            for _ in range(args.repeat):
+                for t in titles:
+                    matcher.match(t)
+            idx_us = (time.perf_counter() - t0) / (args.repeat * len(titles)) * 1e6
+
+            known_tokens = [title_tokens(t) for t in known]
+            t0 = time.perf_counter()
+            for t in titles:
+                pairwise(known_tokens, t)
+            pair_us = (time.perf_counter() - t0) / len(titles) * 1e6
+            products = len(matcher)
+            matcher.close()
+        print(f"{size:>8}{products:>10}{pair_us:>18.1f}{idx_us:>15.1f}{pair_us / idx_us:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
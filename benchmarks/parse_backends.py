@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parse time per page for each installed HTML parser backend.
+
+Each page is parsed and then queried the way its store's scraper does it, so
+the numbers include tree building and the lookups that follow.
+
+Run examples:
+  python benchmarks/parse_backends.py
+  python benchmarks/parse_backends.py --repeat 20 --backends lxml,html.parser
+"""
+import os, sys, time, argparse, statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scrapers"))
+
+from html_parser import BACKENDS, available, parse_html  # noqa: E402
+from fixtures import load_pages  # noqa: E402
+
+
+def extract(store: str, soup) -> int:
+    """Same lookups as the store scrapers; returns the number of products found."""
+    if store == "amazon":
+        items = soup.find_all("div", {"data-component-type": "s-search-result"})
+        for it in items:
+            it.find("h2"), it.find("span", {"class": "a-price-whole"}), it.find("a", href=True)
+        return len(items)
+    if store == "noon":
+        titles = soup.find_all("h2", {"class": "ProductDetailsSection_title__JorAV"})
+        prices = soup.find_all("strong", {"class": "Price_amount__2sXa7"})
+        return min(len(titles), len(prices))
+    if store == "jumia":
+        names, prices = soup.find_all("h3", class_="name"), soup.find_all("div", class_="prc")
+        return min(len(names), len(prices))
+    cards = soup.select(".products.list .product-item") or soup.select(".product-item")
+    for c in cards:
+        c.select_one(".product-item-name a"), c.select_one(".price")
+    return len(cards)
+
+
+def bench(backend: str, store: str, markup: str, repeat: int):
+    times = []
+    found = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        found = extract(store, parse_html(markup, backend))
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000, found
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark HTML parser backends on saved pages.")
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--backends", type=str, default=",".join(BACKENDS))
+    args = ap.parse_args()
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    missing = [b for b in backends if not available(b)]
+    backends = [b for b in backends if available(b)]
+    if missing:
+        print(f"not installed (skipped): {', '.join(missing)}")
+
+    pages = load_pages()
+    print(f"{len(pages)} pages, median of {args.repeat} runs, ms per page\n")
+    print(f"{'page':<24}{'KB':>7}" + "".join(f"{b:>14}" for b in backends))
+    totals = {b: 0.0 for b in backends}
+    for store, name, markup in pages:
+        row = f"{name:<24}{len(markup.encode('utf-8')) / 1024:>7.0f}"
+        for b in backends:
+            ms, found = bench(b, store, markup, args.repeat)
+            totals[b] += ms
+            row += f"{ms:>9.1f} ({found:>2})"
+        print(row)
+    print(f"{'total':<31}" + "".join(f"{totals[b]:>14.1f}" for b in backends))
+    base = totals.get("html.parser")
+    if base:
+        print("speedup vs html.parser: " + ", ".join(f"{b} {base / totals[b]:.1f}x" for b in backends if totals[b]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Full-document parse vs. strained parse (only the result grid) per store.
+
+For each page: median parse+lookup time, peak Python memory while parsing
+(tracemalloc), and the product count from both trees, which must match.
+
+Run examples:
+  python benchmarks/partial_parse.py
+  python benchmarks/partial_parse.py --backend html.parser --repeat 20
+"""
+import os, sys, time, argparse, statistics, tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scrapers"))
+
+from html_parser import STRAINERS, default_backend, parse_html  # noqa: E402
+from fixtures import load_pages  # noqa: E402
+from parse_backends import extract  # noqa: E402
+
+
+def measure(store: str, markup: str, backend: str, only, repeat: int):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        found = extract(store, parse_html(markup, backend, only=only))
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    soup = parse_html(markup, backend, only=only)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del soup
+    return statistics.median(times) * 1000, peak / 1024, found
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark strained vs full parsing of result pages.")
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--backend", type=str, default=None, help="default: SCRAPER_HTML_PARSER / lxml")
+    args = ap.parse_args()
+    backend = args.backend or default_backend()
+
+    pages = load_pages()
+    print(f"{len(pages)} pages, backend {backend}, median of {args.repeat} runs\n")
+    print(f"{'page':<24}{'full ms':>9}{'strain ms':>11}{'full KB':>10}{'strain KB':>11}{'items':>9}")
+    tot = [0.0, 0.0, 0.0, 0.0]
+    for store, name, markup in pages:
+        f_ms, f_kb, f_n = measure(store, markup, backend, None, args.repeat)
+        s_ms, s_kb, s_n = measure(store, markup, backend, STRAINERS[store], args.repeat)
+        for i, v in enumerate((f_ms, s_ms, f_kb, s_kb)):
+            tot[i] += v
+        flag = "" if f_n == s_n else "  MISMATCH"
+        print(f"{name:<24}{f_ms:>9.1f}{s_ms:>11.1f}{f_kb:>10.0f}{s_kb:>11.0f}{f_n:>5}/{s_n:<3}{flag}")
+    print(f"{'total':<24}{tot[0]:>9.1f}{tot[1]:>11.1f}{tot[2]:>10.0f}{tot[3]:>11.0f}")
+    if tot[1] and tot[3]:
+        print(f"strained: {tot[0] / tot[1]:.1f}x faster, {tot[2] / tot[3]:.1f}x less peak memory")
+
+
+if __name__ == "__main__":
+    main()
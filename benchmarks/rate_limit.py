@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fixed pacing vs. the adaptive per-host limiter against a store that throttles.
+
+A local HTTP server answers 429 whenever more than --tolerate requests arrived
+in the last second, 200 otherwise. The same pages are fetched twice over two
+concurrent slots:
+- legacy: the old FetchEngine gate (min_interval + random jitter between request
+  starts) with the old fetch_text retry sleeps;
+- adaptive: FetchEngine + fetch_text as they are now (ratelimit.HostLimiter).
+
+Reports wall time, effective rate and how many 429s each provoked.
+
+Run examples:
+  python benchmarks/rate_limit.py
+  python benchmarks/rate_limit.py --pages 80 --tolerate 5 --interval 2.0 --jitter 1.0 --start 0.4
+"""
+import os, sys, time, random, asyncio, argparse, threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scrapers"))
+
+import requests  # noqa: E402
+from fetch import FetchEngine  # noqa: E402
+
+BODY = b"<html>" + b"x" * 4000 + b"</html>"
+
+
+def make_server(tolerate: int):
+    arrivals, lock, stats = deque(), threading.Lock(), {"ok": 0, "throttled": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            now = time.monotonic()
+            with lock:
+                while arrivals and now - arrivals[0] > 1.0:
+                    arrivals.popleft()
+                arrivals.append(now)
+                over = len(arrivals) > tolerate
+                stats["throttled" if over else "ok"] += 1
+            self.send_response(429 if over else 200)
+            self.send_header("Content-Length", "0" if over else str(len(BODY)))
+            self.end_headers()
+            if not over:
+                self.wfile.write(BODY)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+# ---- legacy copy: fixed spacing between request starts + linear backoff ----
+class LegacyGate:
+    def __init__(self, concurrency, min_interval, jitter):
+        self.sem = asyncio.Semaphore(concurrency)
+        self.lock = asyncio.Lock()
+        self.min_interval, self.jitter, self.next_at = min_interval, jitter, 0.0
+
+    async def pace(self):
+        async with self.lock:
+            delay = self.next_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.next_at = time.monotonic() + self.min_interval + random.random() * self.jitter
+
+
+def legacy_fetch(session, url, tries=4):
+    for attempt in range(1, tries + 1):
+        r = session.get(url, timeout=10)
+        if r.status_code == 200:
+            return r.text
+        time.sleep(0.8 * attempt)
+    return None
+
+
+async def run_legacy(session, urls, concurrency, interval, jitter):
+    gate = LegacyGate(concurrency, interval, jitter)
+    loop = asyncio.get_running_loop()
+
+    async def one(url):
+        async with gate.sem:
+            await gate.pace()
+            return await loop.run_in_executor(None, legacy_fetch, session, url)
+
+    return await asyncio.gather(*(one(u) for u in urls))
+
+
+async def run_adaptive(session, urls, concurrency, start):
+    async with FetchEngine(session, per_host=concurrency, rate=start, timeout=10) as engine:
+        return await engine.fetch_all(urls)
+
+
+def measure(name, coro_fn, stats, pages):
+    before = dict(stats)
+    t0 = time.perf_counter()
+    results = asyncio.run(coro_fn())
+    elapsed = time.perf_counter() - t0
+    got = sum(1 for r in results if r)
+    throttled = stats["throttled"] - before["throttled"]
+    print(f"{name:>10}{elapsed:>9.1f}{got / elapsed:>10.2f}{got:>6}/{pages:<5}{throttled:>6}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark fixed pacing vs adaptive rate limiting.")
+    ap.add_argument("--pages", type=int, default=40)
+    ap.add_argument("--tolerate", type=int, default=3, help="requests/s the fake store accepts")
+    ap.add_argument("--concurrency", type=int, default=2)
+    ap.add_argument("--interval", type=float, default=1.0, help="legacy min_interval")
+    ap.add_argument("--jitter", type=float, default=0.5, help="legacy jitter")
+    ap.add_argument("--start", type=float, default=1.3, help="adaptive starting req/s")
+    args = ap.parse_args()
+
+    server, stats = make_server(args.tolerate)
+    base = f"http://127.0.0.1:{server.server_port}"
+    session = requests.Session()
+    print(f"{'':>10}{'wall s':>9}{'pages/s':>10}{'pages':>11}{'429s':>6}")
+    legacy_urls = [f"{base}/legacy/{i}" for i in range(args.pages)]
+    measure("legacy", lambda: run_legacy(session, legacy_urls, args.concurrency, args.interval, args.jitter),
+            stats, args.pages)
+    adaptive_urls = [f"{base}/adaptive/{i}" for i in range(args.pages)]
+    measure("adaptive", lambda: run_adaptive(session, adaptive_urls, args.concurrency, args.start),
+            stats, args.pages)
+    server.shutdown()   # the limiter's own summary is printed at exit
+
+
+if __name__ == "__main__":
+    main()
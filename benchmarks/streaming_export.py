@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Peak memory of writing N rows: the old 2B save_outputs (collect a list, then
+CSV + json.dump(indent=2)) vs. streaming the same rows through sinks.CsvSink +
+JsonlSink as they are produced.
+
+Rows are the sample products repeated with unique links. Peak is Python heap
+(tracemalloc) while producing and writing; files go to a temp directory.
+
+Run examples:
+  python benchmarks/streaming_export.py
+  python benchmarks/streaming_export.py --rows 10000 100000
+"""
+import os, csv, sys, json, time, argparse, tempfile, tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scrapers"))
+
+from sinks import csv_jsonl_sink  # noqa: E402
+from fixtures import sample_products  # noqa: E402
+
+FIELDS = ["store", "title", "link", "price", "category", "query", "brand_or_model", "model", "suffix"]
+
+
+def produce(samples, n):
+    for i in range(n):
+        row = dict(samples[i % len(samples)])
+        row["link"] = f"{row.get('link') or 'https://example.com/p'}?i={i}"
+        yield row
+
+
+def legacy(samples, n, d):
+    rows = list(produce(samples, n))
+    with open(os.path.join(d, "legacy.csv"), "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=FIELDS)
+        w.writeheader()
+        for r in rows:
+            w.writerow({k: r.get(k, "") for k in FIELDS})
+    with open(os.path.join(d, "legacy.json"), "w", encoding="utf-8") as f:
+        json.dump(rows, f, ensure_ascii=False, indent=2)
+
+
+def streaming(samples, n, d):
+    with csv_jsonl_sink(os.path.join(d, "stream.csv"), os.path.join(d, "stream.jsonl"), FIELDS) as sink:
+        for row in produce(samples, n):
+            sink.add(row)
+
+
+def measure(fn, samples, n):
+    with tempfile.TemporaryDirectory() as d:
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        fn(samples, n, d)
+        elapsed = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak / 1024 / 1024, elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark list+dump vs streaming export.")
+    ap.add_argument("--rows", type=int, nargs="+", default=[2000, 20000, 100000])
+    args = ap.parse_args()
+
+    samples = sample_products()
+    print(f"{'rows':>8}{'list+dump MB':>14}{'stream MB':>11}{'list+dump s':>13}{'stream s':>10}")
+    for n in args.rows:
+        l_mb, l_s = measure(legacy, samples, n)
+        s_mb, s_s = measure(streaming, samples, n)
+        print(f"{n:>8}{l_mb:>14.1f}{s_mb:>11.2f}{l_s:>13.2f}{s_s:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
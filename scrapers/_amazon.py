@@ -4,11 +4,16 @@
 # - Shows extracted title, price, link if found
 
 import requests
-from bs4 import BeautifulSoup
+from html_parser import parse_html, AMAZON_RESULTS
 import re
-import time
 import random
+import asyncio
 from supabase import create_client, Client
+from fetch import FetchEngine
+from sessions import get_session, describe
+from supabase_writer import products_writer
+from textmatch import TermMatcher
+from extraction import amazon_columns
 
 # --- Supabase Setup ---
 import os, sys
@@ -21,6 +26,7 @@ if not SUPABASE_URL or not SUPABASE_KEY:
              "Add repo secrets and map them via env in the workflow.")
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+writer = products_writer(supabase, "Amazon", mode="insert")
 
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
@@ -32,77 +38,27 @@ CATEGORY_MAPPING = {
     'mobiles': '21832883031'
 }
 
+KEYWORDS = [
+    "iphone", "samsung", "xiaomi", "oppo", "huawei",
+    "realme", "vivo", "oneplus", "poco", "nokia", "sony", "lg"
+]
+
 ACCESSORY_KEYWORDS = [
     "case", "cover", "screen", "protector", "glass", "accessory", "charger", "cable", "headset",
     "جراب", "حافظة", "زجاج", "واقي", "شاحن", "كابل", "سماعة", "لاصقة", "كفر", "حماية", "غطاء",
     "شاشة", "سماعات", "قلم", "عدسة", "غطى", "كاميرا", "سلك", "بطارية", "حقيبة", "محفظة",
     "جلد", "سيليكون", "اسكرين", "باور بانك", "سكرين"
 ]
-
-def normalize_arabic(text):
-    text = re.sub(r"[إأآا]", "ا", text)
-    text = re.sub(r"[ى]", "ي", text)
-    text = re.sub(r"[ة]", "ه", text)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+ACCESSORY_MATCHER = TermMatcher(ACCESSORY_KEYWORDS)
 
 def is_accessory(title):
-    title_norm = normalize_arabic(title).lower()
-    for word in ACCESSORY_KEYWORDS:
-        if word in title_norm:
-            return True
-    return False
+    return ACCESSORY_MATCHER.matches(title)
 
 def extract_brand_or_model(title):
-    title_norm = normalize_arabic(title.lower())
-    brand_map = {
-        "ايفون": "ايفون", "آيفون": "ايفون", "apple": "Apple", "ابل": "Apple",
-        "سامسونج": "سامسونج", "samsung": "Samsung",
-        "ريلمي": "ريلمي", "realme": "Realme",
-        "هواوي": "هواوي", "huawei": "Huawei",
-        "شاومي": "شاومي", "xiaomi": "Xiaomi",
-        "اوبو": "اوبو", "oppo": "Oppo",
-        "فيفو": "فيفو", "vivo": "Vivo",
-        "نوكيا": "نوكيا", "nokia": "Nokia",
-        "سوني": "سوني", "sony": "Sony",
-        "جوجل": "جوجل", "google": "Google Pixel",
-        "موتورولا": "موتورولا", "motorola": "Motorola",
-        "ون بلس": "ون بلس", "oneplus": "OnePlus",
-        "ال جي": "ال جي", "lg": "LG",
-        "بوكو": "بوكو", "poco": "Poco"
-    }
-
-    for keyword, brand in brand_map.items():
-        if keyword in title_norm:
-            return brand
-    return "Unknown"
+    return amazon_columns(title)[0]
 
 def extract_model_and_suffix(title):
-    title = normalize_arabic(title)
-    suffix = ""
-
-    # سuffix = "Pro" or "برو"
-    suffix_match = re.search(r"\b(pro|برو)\b", title, re.IGNORECASE)
-    if suffix_match:
-        suffix = suffix_match.group(1).capitalize()
-
-    # Samsung model like "ايه 55" -> A55
-    match = re.search(r"\bايه\s*(\d{1,3})\b", title)
-    if match:
-        return f"A{match.group(1)}", suffix
-
-    # Redmi "نوت 13" → Note 13
-    if "ريدمي" in title and "نوت" in title:
-        note_match = re.search(r"نوت\s*(\d{1,3})", title)
-        if note_match:
-            return f"Note{note_match.group(1)}", "نوت" if not suffix else suffix
-
-    # General models like "S23", "C53", "13 Pro"
-    match = re.search(r"\b([a-zA-Z]{1,2}\d{1,3}[a-zA-Z+]{0,4})\b", title, re.IGNORECASE)
-    if match:
-        return match.group(1).upper(), suffix
-
-    return None, suffix
+    return amazon_columns(title)[1:]
 
 def build_search_url(keyword, category_code=None, page=1):
     base_url = 'https://www.amazon.eg/s'
@@ -111,97 +67,132 @@ def build_search_url(keyword, category_code=None, page=1):
         params['rh'] = f'n:{category_code}'
     return requests.Request('GET', base_url, params=params).prepare().url
 
-def get_products_from_search(keyword, category_code=None):
+PAGES_PER_KEYWORD = 3
+CONCURRENCY = 2          # pages in flight against amazon.eg at once
+START_RATE = 0.4         # req/s to start with; adapts to how amazon.eg answers (ratelimit.py)
+
+def is_robot_check(html):
+    """Amazon's "enter the characters you see" page (served as 200; never cached)."""
+    return "/errors/validateCaptcha" in html
+
+def parse_search_page(html, keyword, seen_links):
+    soup = parse_html(html, only=AMAZON_RESULTS)
+    results = soup.find_all('div', {'data-component-type': 's-search-result'})
     products = []
-    seen_links = set()
 
-    for page in range(1, 4):
-        url = build_search_url(keyword, category_code, page)
-        print(f"[+] Accessing: {url}")
+    for item in results:
+        title_tag = item.find('h2')
+        title = title_tag.get_text(strip=True) if title_tag else None
 
-        headers = {
-            "User-Agent": random.choice(USER_AGENTS),
-            "Accept-Language": "ar-EG,ar;q=0.9",
-            "Referer": "https://www.amazon.eg/",
-        }
+        price_whole = item.find('span', {'class': 'a-price-whole'})
+        price_fraction = item.find('span', {'class': 'a-price-fraction'})
 
-        session = requests.Session()
-        response = session.get(url, headers=headers, timeout=20)
-        if response.status_code != 200:
-            print("[!] Failed to fetch page")
+        if price_whole:
+            try:
+                whole_digits = re.sub(r'[^\d]', '', price_whole.text)
+                fraction_digits = price_fraction.text if price_fraction else '00'
+                price = float(f"{whole_digits}.{fraction_digits}")
+            except:
+                price = None
+        else:
+            price = None
+
+        a_tag = item.find('a', href=True)
+        link = 'https://www.amazon.eg' + a_tag['href'].split('?')[0] if a_tag and '/dp/' in a_tag['href'] else None
+
+        if not title or not price or not link:
+            continue
+        if is_accessory(title) or price < 1000 or link in seen_links:
             continue
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-        results = soup.find_all('div', {'data-component-type': 's-search-result'})
-        print(f"[+] Found {len(results)} raw results on page {page}")
-
-        for item in results:
-            title_tag = item.find('h2')
-            title = title_tag.get_text(strip=True) if title_tag else None
-
-            price_whole = item.find('span', {'class': 'a-price-whole'})
-            price_fraction = item.find('span', {'class': 'a-price-fraction'})
-
-            if price_whole:
-                try:
-                    whole_digits = re.sub(r'[^\d]', '', price_whole.text)
-                    fraction_digits = price_fraction.text if price_fraction else '00'
-                    price = float(f"{whole_digits}.{fraction_digits}")
-                except:
-                    price = None
-            else:
-                price = None
+        seen_links.add(link)
+        brand_or_model = extract_brand_or_model(title)
+        model, suffix = extract_model_and_suffix(title)
+
+        product = {
+            'title': title,
+            'price': price,
+            'link': link,
+            'store': 'Amazon',
+            'category': 'mobiles',
+            'query': keyword,
+            'brand_or_model': brand_or_model,
+            'model': model,
+            'suffix': suffix
+        }
 
-            a_tag = item.find('a', href=True)
-            link = 'https://www.amazon.eg' + a_tag['href'].split('?')[0] if a_tag and '/dp/' in a_tag['href'] else None
-
-            if not title or not price or not link:
-                continue
-            if is_accessory(title) or price < 1000 or link in seen_links:
-                continue
-
-            seen_links.add(link)
-            brand_or_model = extract_brand_or_model(title)
-            model, suffix = extract_model_and_suffix(title)
-
-            product = {
-                'title': title,
-                'price': price,
-                'store': 'Amazon',
-                'category': 'mobiles',
-                'query': keyword,
-                'brand_or_model': brand_or_model,
-                'model': model,
-                'suffix': suffix
-            }
-
-            # Upload to Supabase
-            try:
-                supabase.table("products").insert(product).execute()
-                print(f"✅ Uploaded: {title[:40]}... - {price} EGP")
-            except Exception as e:
-                print(f"[!] Supabase insert failed: {e}")
+        # Queue for Supabase (sent in batches)
+        writer.add(product)
+        print(f"✅ Queued: {title[:40]}... - {price} EGP")
 
-            products.append(product)
+        products.append(product)
 
-        time.sleep(random.uniform(3, 6))
+    return len(results), products
 
+def _collect_keyword(keyword, pages, keep=None):
+    kept = 0
+    seen_links = set()
+    for page, html in enumerate(pages, 1):
+        if html is None:
+            print(f"[!] Failed to fetch page {page} for '{keyword}'")
+            continue
+        found, page_products = parse_search_page(html, keyword, seen_links)
+        print(f"[+] Found {found} raw results on page {page} for '{keyword}'")
+        kept += len(page_products)
+        if keep is not None:
+            keep.extend(page_products)
+    return kept
+
+async def _search_keyword(engine, keyword, category_code, keep=None):
+    urls = [build_search_url(keyword, category_code, page) for page in range(1, PAGES_PER_KEYWORD + 1)]
+    for url in urls:
+        print(f"[+] Accessing: {url}")
+    pages = await engine.fetch_all(urls)
+    return await asyncio.to_thread(_collect_keyword, keyword, pages, keep)
+
+def stream_products_for_keywords(keywords, category_code=None, concurrency=CONCURRENCY, keep=None):
+    """Fetch the whole keyword x page grid concurrently (politely paced per host).
+
+    Products stream to the writer page by page and are not collected (unless a
+    `keep` list is given); returns how many were queued.
+    """
+    session = get_session("amazon", headers={
+        "User-Agent": random.choice(USER_AGENTS),
+        "Accept-Language": "ar-EG,ar;q=0.9",
+        "Referer": "https://www.amazon.eg/",
+    })
+
+    async def _run():
+        engine = FetchEngine(session, per_host=concurrency, rate=START_RATE, timeout=20,
+                             cacheable=lambda html: not is_robot_check(html))
+        try:
+            results = await asyncio.gather(*(_search_keyword(engine, kw, category_code, keep) for kw in keywords))
+        finally:
+            engine.close()
+        return sum(results)
+
+    queued = asyncio.run(_run())
+    writer.flush()
+    print(writer.summary())
+    print(describe("amazon"))
+    return queued
+
+def get_products_for_keywords(keywords, category_code=None, concurrency=CONCURRENCY):
+    """Same as stream_products_for_keywords(), but returns the products as a list."""
+    products = []
+    stream_products_for_keywords(keywords, category_code, concurrency, keep=products)
     return products
 
+def get_products_from_search(keyword, category_code=None):
+    return get_products_for_keywords([keyword], category_code)
+
 if __name__ == "__main__":
-    keywords = [
-        "iphone", "samsung", "xiaomi", "oppo", "huawei",
-        "realme", "vivo", "oneplus", "poco", "nokia", "sony", "lg"
-    ]
     category_code = CATEGORY_MAPPING.get("mobiles")
 
-    all_products = []
-    for kw in keywords:
-        print(f"\n=== Searching for: {kw} ===")
-        prods = get_products_from_search(kw, category_code)
-        all_products.extend(prods)
+    print(f"\n=== Searching for: {', '.join(KEYWORDS)} ===")
+    total = stream_products_for_keywords(KEYWORDS, category_code)
 
-    print(f"\n✅ Total products uploaded: {len(all_products)}")
+    print(f"\n✅ Total products uploaded: {total}")
 
 
 
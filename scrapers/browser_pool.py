@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+Warm, reusable headless Chrome pool for the Selenium scrapers (Jumia, B.TECH).
+
+Chrome is started once per pool slot and handed out to queries, instead of a
+fresh browser per call. Between leases the browser's cookies and storage are
+cleared; a browser is recycled (quit + restarted) after BROWSER_MAX_PAGES page
+loads or when its process tree grows past BROWSER_MAX_RSS_MB (needs psutil;
+without it only the page limit applies). chromedriver is installed lazily on the
+first browser start rather than at import time.
+
+Lean mode (default) loads only what the scrapers read: images are disabled,
+fonts, media and known ad/tracker hosts are blocked through the DevTools
+protocol, and the page-load strategy is "eager" (return at DOMContentLoaded).
+
+wait_for_selectors() replaces fixed sleeps after navigation: it returns as soon
+as the product grid selectors are present and their counts stop changing, and
+logs how long each wait actually took.
+
+ENV (optional):
+  BROWSER_POOL_SIZE=2        Chrome instances shared by all Selenium scrapers
+  BROWSER_MAX_PAGES=50       page loads before a browser is recycled
+  BROWSER_MAX_RSS_MB=1024    memory ceiling (chromedriver + Chrome processes)
+  BROWSER_LEAN=1             0 loads pages in full, as before
+  BROWSER_URL_BLOCKLIST=     extra comma-separated URL patterns to block (e.g. *ads.example.com*)
+  BROWSER_WAIT_TIMEOUT=15    max seconds to wait for a product grid
+"""
+import os, time, queue, atexit, threading
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+try:
+    import chromedriver_autoinstaller
+except Exception:
+    chromedriver_autoinstaller = None
+
+try:
+    import psutil
+except Exception:
+    psutil = None
+
+DEFAULT_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+DEFAULT_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "50"))
+DEFAULT_MAX_RSS_MB = int(os.getenv("BROWSER_MAX_RSS_MB", "1024"))
+LEAN_BROWSER = os.getenv("BROWSER_LEAN", "1").strip().lower() not in ("0", "false", "no", "off")
+DEFAULT_WAIT_TIMEOUT = float(os.getenv("BROWSER_WAIT_TIMEOUT", "15"))
+
+# Network.setBlockedURLs patterns ("*" wildcards) blocked in lean mode
+DEFAULT_BLOCKLIST = [
+    # fonts and media
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*.mp4", "*.webm",
+    # images (belt and braces; image loading is also disabled via prefs)
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    # ads / analytics / trackers
+    "*doubleclick.net*", "*googlesyndication.com*", "*googletagmanager.com*",
+    "*google-analytics.com*", "*googleadservices.com*", "*facebook.net*",
+    "*connect.facebook.com*", "*hotjar.com*", "*clarity.ms*", "*criteo.com*",
+    "*criteo.net*", "*tiktok.com*", "*snap.licdn.com*", "*sc-static.net*",
+    "*adservice.google.*", "*newrelic.com*", "*nr-data.net*",
+]
+
+_INSTALL_LOCK = threading.Lock()
+_installed = False
+
+
+def ensure_chromedriver():
+    global _installed
+    with _INSTALL_LOCK:
+        if not _installed and chromedriver_autoinstaller is not None:
+            chromedriver_autoinstaller.install()
+        _installed = True
+
+
+def url_blocklist() -> List[str]:
+    extra = [p.strip() for p in os.getenv("BROWSER_URL_BLOCKLIST", "").split(",") if p.strip()]
+    return DEFAULT_BLOCKLIST + extra
+
+
+def chrome_options(lean: bool = LEAN_BROWSER) -> Options:
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920x1080")
+    if lean:
+        options.page_load_strategy = "eager"
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--disable-extensions")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+    return options
+
+
+def apply_blocklist(driver, patterns: List[str]):
+    """Block URL patterns for every request this browser makes (Chrome only)."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        print(f"[browser] URL blocklist not applied: {e}")
+
+
+_COUNT_JS = """
+return [document.readyState].concat(
+    arguments[0].map(function (s) { return document.querySelectorAll(s).length; }));
+"""
+
+
+def wait_for_selectors(driver, selectors: List[str], timeout: float = DEFAULT_WAIT_TIMEOUT,
+                       stable_for: float = 0.3, empty_grace: float = 2.0, poll: float = 0.1,
+                       label: str = "") -> Tuple[float, List[int]]:
+    """Wait until every selector matches and the match counts are stable.
+
+    Ready when all counts are > 0 and unchanged for `stable_for` seconds. A page that
+    finished loading with no matches (end of results) is accepted after `empty_grace`
+    seconds of zero counts. Returns (seconds waited, final counts).
+    """
+    t0 = time.monotonic()
+    last: Optional[List[int]] = None
+    since = t0
+    status = "timeout"
+    counts: List[int] = [0] * len(selectors)
+    while True:
+        now = time.monotonic()
+        try:
+            state, *counts = driver.execute_script(_COUNT_JS, selectors)
+        except Exception:
+            state, counts = "loading", [0] * len(selectors)
+        if counts != last:
+            last, since = counts, now
+        steady = now - since
+        if all(counts) and steady >= stable_for:
+            status = "ready"
+            break
+        if state == "complete" and not any(counts) and steady >= empty_grace:
+            status = "empty"
+            break
+        if now - t0 >= timeout:
+            break
+        time.sleep(poll)
+    waited = time.monotonic() - t0
+    print(f"[wait] {label or driver.current_url}: {status} after {waited:.2f}s {dict(zip(selectors, counts))}")
+    return waited, counts
+
+
+class Browser:
+    """One pooled Chrome: a driver plus its page-load counter."""
+
+    def __init__(self, pool: "BrowserPool"):
+        self.pool = pool
+        self.driver: Optional[webdriver.Chrome] = None
+        self.pages = 0
+        self.start()
+
+    def start(self):
+        ensure_chromedriver()
+        t0 = time.monotonic()
+        self.driver = webdriver.Chrome(options=self.pool.options_factory())
+        if self.pool.blocklist:
+            apply_blocklist(self.driver, self.pool.blocklist)
+        self.pages = 0
+        self.pool.starts += 1
+        print(f"[browser] Chrome started in {time.monotonic() - t0:.1f}s")
+
+    def quit(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+    def restart(self, reason: str):
+        print(f"[browser] recycling Chrome ({reason})")
+        self.quit()
+        self.start()
+
+    def rss_mb(self) -> Optional[float]:
+        if psutil is None or self.driver is None:
+            return None
+        try:
+            root = psutil.Process(self.driver.service.process.pid)
+            procs = [root] + root.children(recursive=True)
+            return sum(p.memory_info().rss for p in procs) / (1024 * 1024)
+        except Exception:
+            return None
+
+    def recycle_reason(self) -> Optional[str]:
+        if self.pages >= self.pool.max_pages:
+            return f"{self.pages} pages"
+        rss = self.rss_mb()
+        if rss is not None and rss > self.pool.max_rss_mb:
+            return f"{rss:.0f} MB"
+        return None
+
+    def get(self, url: str):
+        """Navigate, recycling first if this browser is due."""
+        reason = self.recycle_reason()
+        if reason:
+            self.restart(reason)
+        t0 = time.monotonic()
+        self.driver.get(url)
+        self.pages += 1
+        self.pool.page_loads += 1
+        self.pool.page_seconds += time.monotonic() - t0
+        rss = self.rss_mb()
+        if rss is not None:
+            self.pool.peak_rss_mb = max(self.pool.peak_rss_mb, rss)
+
+    def wait_for(self, selectors: List[str], timeout: float = DEFAULT_WAIT_TIMEOUT,
+                 label: str = "") -> List[int]:
+        """wait_for_selectors() on this browser; returns the final match counts."""
+        waited, counts = wait_for_selectors(self.driver, selectors, timeout=timeout, label=label)
+        self.pool.wait_seconds += waited
+        return counts
+
+    @property
+    def page_source(self) -> str:
+        return self.driver.page_source
+
+    def reset(self):
+        """Drop per-query state so the next lease starts clean."""
+        try:
+            self.driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+            self.driver.delete_all_cookies()
+            self.driver.get("about:blank")
+        except Exception:
+            self.restart("reset failed")
+
+
+class BrowserPool:
+    """Up to `size` warm browsers; lease one with `with pool.browser() as b:`."""
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, max_pages: int = DEFAULT_MAX_PAGES,
+                 max_rss_mb: int = DEFAULT_MAX_RSS_MB, lean: bool = LEAN_BROWSER,
+                 blocklist: Optional[List[str]] = None,
+                 options_factory: Optional[Callable[[], Options]] = None):
+        self.size = max(1, size)
+        self.max_pages = max(1, max_pages)
+        self.max_rss_mb = max_rss_mb
+        self.lean = lean
+        self.blocklist = (url_blocklist() if blocklist is None else blocklist) if lean else []
+        self.options_factory = options_factory or (lambda: chrome_options(lean=lean))
+        self._idle: "queue.Queue[Browser]" = queue.Queue()
+        self._all: List[Browser] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.starts = 0
+        self.leases = 0
+        self.page_loads = 0
+        self.page_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.peak_rss_mb = 0.0
+
+    def warm(self):
+        """Start every slot now instead of on first use."""
+        with self._lock:
+            missing = self.size - len(self._all)
+            fresh = [Browser(self) for _ in range(missing)]
+            self._all.extend(fresh)
+        for b in fresh:
+            self._idle.put(b)
+
+    def _acquire(self) -> Browser:
+        if self._closed:
+            raise RuntimeError("browser pool is closed")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.size:
+                b = Browser(self)
+                self._all.append(b)
+                return b
+        return self._idle.get()
+
+    @contextmanager
+    def browser(self):
+        b = self._acquire()
+        self.leases += 1
+        try:
+            yield b
+        finally:
+            if self._closed:
+                b.quit()
+            else:
+                b.reset()
+                self._idle.put(b)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        with self._lock:
+            for b in self._all:
+                b.quit()
+            self._all.clear()
+        if self.leases:
+            n = self.page_loads or 1
+            rss = f", peak {self.peak_rss_mb:.0f} MB per browser" if self.peak_rss_mb else ""
+            print(f"[browser] pool closed: {self.leases} leases served by {self.starts} Chrome starts; "
+                  f"{self.page_loads} pages, avg load {self.page_seconds / n:.2f}s + "
+                  f"wait {self.wait_seconds / n:.2f}s{rss} (lean={self.lean})")
+
+
+_POOL: Optional[BrowserPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool() -> BrowserPool:
+    """Process-wide pool shared by the Selenium scrapers; closed at exit."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = BrowserPool()
+            atexit.register(_POOL.close)
+        return _POOL
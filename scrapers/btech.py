@@ -1,12 +1,10 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-import time
 from supabase import create_client, Client
 import os, sys
-import chromedriver_autoinstaller
+from supabase_writer import products_writer
+from browser_pool import get_pool
+from textmatch import TermMatcher
 
-chromedriver_autoinstaller.install()
 # Supabase config
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -17,6 +15,7 @@ if not SUPABASE_URL or not SUPABASE_KEY:
              "Add repo secrets and map them via env in the workflow.")
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+writer = products_writer(supabase, "B.TECH", mode="upsert")
 
 ACCESSORY_KEYWORDS_AR = [
     "جراب", "كفر", "حماية", "غطاء", "لاصقة", "شاشة", "واقي",
@@ -28,7 +27,7 @@ ACCESSORY_KEYWORDS_AR = [
 
 ACCESSORY_KEYWORDS_EN = [
     "case", "cover", "screen", "protector", "glass", "accessory", "charger",
-    "cable", "headset", "silicone", "bumper", "shell", "skin", "sleeve", "lens", "wallet"
+    "cable", "headset", "silicone", "bumper", "shell", "skin", "sleeve", "lens", "wallet",
     "battery", "bag", "pouch", "leather", "silicone", "shockproof", "tempered glass",
     "power bank", "powerbank", "headphones", "earphones", "earbuds", "stylus", "stand",
     "tripod", "car mount", "holder", "adapter", "dock", "cradle", "wristband", "strap",
@@ -37,26 +36,31 @@ ACCESSORY_KEYWORDS_EN = [
     "HDMI cable", "OTG cable", "audio cable", "charging dock",
 ]
 
-def is_accessory(title):
-    title_lower = title.lower()
-    return any(word in title_lower for word in ACCESSORY_KEYWORDS_AR + ACCESSORY_KEYWORDS_EN)
-
-def search_btech_fixed(product_name, category=""):
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--window-size=1920x1080")
-    driver = webdriver.Chrome(options=options)
+ACCESSORY_MATCHER = TermMatcher(ACCESSORY_KEYWORDS_AR + ACCESSORY_KEYWORDS_EN)
 
+def is_accessory(title):
+    return ACCESSORY_MATCHER.matches(title)
+
+def search_btech_fixed(product_name, category="", pool=None, keep=None):
+    """Search B.TECH; rows go to the writer as they are read and are not collected
+    (unless a `keep` list is given). Returns how many were queued."""
+    with (pool or get_pool()).browser() as browser:
+        queued = _search_btech(browser, product_name, category, keep)
+    writer.flush()
+    print(writer.summary())
+    return queued
+
+def _search_btech(browser, product_name, category, keep=None):
     print(f"[🔍] Searching B.TECH for: {product_name}")
 
     url = f"https://btech.com/ar/catalogsearch/result/?q={product_name}"
-    driver.get(url)
-    time.sleep(4)
+    browser.get(url)
+    browser.wait_for(["div.plpContentWrapper h2.plpTitle", "div.plpContentWrapper span.price-wrapper"],
+                     label=f"btech '{product_name}'")
 
-    product_blocks = driver.find_elements(By.CSS_SELECTOR, "div.plpContentWrapper")
+    product_blocks = browser.driver.find_elements(By.CSS_SELECTOR, "div.plpContentWrapper")
 
-    all_products = []
+    queued = 0
     seen_titles = set()
 
     for block in product_blocks:
@@ -82,23 +86,20 @@ def search_btech_fixed(product_name, category=""):
                 "query": product_name
             }
 
-            all_products.append(product_data)
+            writer.add(product_data)
+            queued += 1
+            if keep is not None:
+                keep.append(product_data)
 
-            supabase.table("products").upsert(product_data).execute()
+            print(f"{queued}. السعر: {price} جنيه")
+            print(f"   الاسم: {title}")
+            print("-" * 80)
 
         except Exception as e:
             continue
 
-    driver.quit()
-
-    print(f"\n✅ Found {len(all_products)} products on B.TECH for '{product_name}':")
-    print("-" * 80)
-    for i, product in enumerate(all_products, 1):
-        print(f"{i}. السعر: {product['price']} جنيه")
-        print(f"   الاسم: {product['title']}")
-        print("-" * 80)
-
-    return all_products
+    print(f"\n✅ Found {queued} products on B.TECH for '{product_name}'")
+    return queued
 
 if __name__ == "__main__":
     product = input("🔎 اكتب اسم المنتج للبحث: ").strip()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Append-only crawl journal, so an interrupted crawl resumes instead of starting over.
+
+Every finished unit of work (e.g. one search page of one term) is appended as a
+JSON line with its key, the rows it produced and a little state (is it the last
+page, the next URL, ...), and flushed right away. A restarted run replays the
+journaled rows and skips the work, then continues where the journal stops.
+
+Only each key's state and the offset of its line stay in memory; rows() reads a
+unit's rows back from the file when it is replayed, so a long crawl does not
+hold everything it journaled.
+
+The first line holds the run's parameters and start time; a journal written with
+different parameters, or older than max_age hours, is discarded and a new one
+started. complete() removes the journal once a run has finished everything;
+a run with failures keeps it, so a rerun retries just what failed.
+
+persisted() records that everything journaled so far is also stored downstream
+(e.g. the price history was flushed); those entries carry persisted=True when
+resumed. A run that was killed never gets there, so its pages are not marked.
+
+A half-written last line (process killed mid-write) is ignored on load, and
+ended with a newline before anything new is appended.
+"""
+import os, json, time, threading
+from typing import Dict, List, Optional, Tuple
+
+
+class CrawlJournal:
+    """(key -> entry) checkpoints persisted as JSON lines. Thread-safe."""
+
+    def __init__(self, path: str, params: Dict, max_age_hours: float = 12.0):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self.params = params
+        self.max_age = max_age_hours * 3600
+        self._lock = threading.Lock()
+        self._reader = None
+        self._entries: Dict[str, Tuple[int, Dict]] = {}
+        torn = self._load()
+        self.resumed = len(self._entries)
+        self.recorded = 0
+        self.failures = 0
+        if self.resumed:
+            self._file = open(path, "ab")
+            if torn:
+                self._file.write(b"\n")
+                self._file.flush()
+        else:
+            self._file = open(path, "wb")
+            self._append({"params": params, "started": time.time()})
+
+    def _load(self) -> bool:
+        """Index the journal's entries by key; True when its last line is unterminated."""
+        try:
+            f = open(self.path, "rb")
+        except OSError:
+            return False
+        with f:
+            head = f.readline()
+            try:
+                head = json.loads(head) if head else {}
+            except ValueError:
+                return False
+            if head.get("params") != self.params or time.time() - head.get("started", 0) > self.max_age:
+                return False
+            offset = f.tell()
+            line = b"\n"
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    entry = None   # torn write at the end
+                if entry is not None and "persisted" in entry:
+                    for _, state in self._entries.values():
+                        state["persisted"] = True
+                elif entry is not None:
+                    entry.pop("rows", None)
+                    self._entries[entry["key"]] = (offset, entry)
+                offset += len(line)
+            return not line.endswith(b"\n")
+
+    def _append(self, obj: Dict) -> int:
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(json.dumps(obj, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+        self._file.flush()
+        return offset
+
+    # ---- public API ----
+    def get(self, key: str) -> Optional[Dict]:
+        """The journaled state for `key` (work already done), or None. Rows: rows(key)."""
+        with self._lock:
+            hit = self._entries.get(key)
+            return hit[1] if hit else None
+
+    def rows(self, key: str) -> List[Dict]:
+        """The rows journaled for `key`, read back from the file."""
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is None:
+                return []
+            if self._reader is None:
+                self._reader = open(self.path, "rb")
+            self._reader.seek(hit[0])
+            return json.loads(self._reader.readline()).get("rows", [])
+
+    def record(self, key: str, rows: List[Dict], **state):
+        """Mark `key` done with the rows it produced (written before the rows are used)."""
+        with self._lock:
+            offset = self._append({"key": key, "rows": rows, **state})
+            self._entries[key] = (offset, {"key": key, **state})
+            self.recorded += 1
+
+    def persisted(self):
+        """Everything recorded so far has been stored downstream (see the module docstring)."""
+        with self._lock:
+            self._append({"persisted": time.time()})
+            for _, state in self._entries.values():
+                state["persisted"] = True
+
+    def failed(self):
+        """Count a unit that could not be done (keeps the journal for a rerun)."""
+        with self._lock:
+            self.failures += 1
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+    def complete(self):
+        """Everything finished: the journal is no longer needed."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def summary(self) -> str:
+        return (f"📒 checkpoint {self.path}: {self.resumed} units resumed, {self.recorded} recorded"
+                + (f", {self.failures} failed (kept for a rerun)" if self.failures else ""))
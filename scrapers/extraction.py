@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""
+Brand / series / model / storage extraction for phone titles, shared by all stores.
+
+Everything is driven by the tables below and compiled once at import:
+- ALIASES: Arabic (and alternate) spellings -> one English token, applied as a
+  single whole-word pass ("ايفون" -> iphone, "جالاكسي" -> galaxy, "برو" -> pro).
+- BRANDS / SERIES: canonical brand and series tokens, found with one combined
+  regex and resolved by table priority (a series implies its brand).
+- MODEL_RULES: model patterns per brand/series (including series words such as
+  Infinix Hot, Huawei Nova, Tecno Camon), tried before the generic
+  letters+digits code pattern. A letter written apart from the number
+  ("Reno 11 F", "Xiaomi 14 T") stays part of the model.
+- TABLET_WORDS: iPad / Tab / Pad markers. A tablet's model carries its marker
+  ("Tab S9", "iPad 11"), so it never reads as the phone with the same code.
+- Storage, RAM, 5G and dual-SIM flags come from a handful of precompiled regexes.
+
+extract(title) returns a frozen PhoneSpec and is memoized on the raw title;
+PhoneSpec.suffix renders the "8GB RAM / 256GB / 5G / Dual SIM" string 2B always
+stored. Amazon and Noon keep their own historical column formats through
+amazon_columns() / noon_columns() at the bottom.
+"""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from textnorm import CACHE_SIZE, TokenMapper, normalize_arabic, normalize_lower
+
+# ---------------- Rule tables ----------------
+
+ALIASES: Dict[str, str] = {
+    # brands / series
+    "ايفون": "iphone", "ابل": "apple", "ايباد": "ipad",
+    "سامسونج": "samsung", "جالكسي": "galaxy", "جالاكسي": "galaxy", "جلاكسي": "galaxy",
+    "شاومي": "xiaomi", "ريدمي": "redmi", "بوكو": "poco",
+    "اوبو": "oppo", "رينو": "reno", "ريلمي": "realme", "ريل مي": "realme", "ريملي": "realme",
+    "هواوي": "huawei", "هونر": "honor", "اونر": "honor", "فيفو": "vivo", "نوكيا": "nokia",
+    "ون بلس": "oneplus", "one plus": "oneplus", "موتورولا": "motorola",
+    "انفنيكس": "infinix", "تكنو": "tecno", "سوني": "sony", "جوجل": "google",
+    "بكسل": "pixel", "بيكسل": "pixel",
+    "ال جي": "lg",
+    # variants / model words
+    "برو ماكس": "pro max", "برو": "pro", "ماكس": "max", "بلس": "plus", "الترا": "ultra",
+    "اير": "air", "ميني": "mini", "لايت": "lite", "نوت": "note", "ايه": "a", "اس": "s",
+    "فولد": "fold", "فليب": "flip", "اف اي": "fe",
+    "هوت": "hot", "نوفا": "nova", "ماجيك": "magic", "كامون": "camon", "سبارك": "spark",
+    "بوفا": "pova", "ايدج": "edge", "نورد": "nord",
+    "تابلت": "tablet", "تاب": "tab", "باد": "pad", "ميت باد": "matepad",
+    # memory / connectivity
+    "جيجا بايت": "gb", "جيجابايت": "gb", "جيجا": "gb", "تيرابايت": "tb", "تيرا": "tb",
+    "رام": "ram", "ذاكرة وصول عشوائي": "ram", "الجيل الخامس": "5g",
+    "ثنائي الشريحة": "dual sim", "ثنائي الشرائح": "dual sim", "بشريحتين": "dual sim",
+    "شريحتين": "dual sim", "بشريحتي اتصال": "dual sim",
+}
+
+# (brand, tokens) in priority order: the first brand with a token in the title wins
+BRANDS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("apple", ("iphone", "ipad", "apple")),
+    ("samsung", ("samsung", "galaxy")),
+    ("xiaomi", ("redmi", "poco", "xiaomi")),
+    ("oppo", ("oppo", "reno")),
+    ("realme", ("realme",)),
+    ("huawei", ("huawei",)),
+    ("honor", ("honor",)),
+    ("vivo", ("vivo",)),
+    ("nokia", ("nokia",)),
+    ("oneplus", ("oneplus",)),
+    ("motorola", ("motorola",)),
+    ("infinix", ("infinix",)),
+    ("tecno", ("tecno",)),
+    ("sony", ("sony",)),
+    ("google", ("google", "pixel")),
+    ("lg", ("lg",)),
+]
+
+# series token -> brand (checked before plain brand tokens)
+SERIES: Dict[str, str] = {
+    "ipad": "apple", "galaxy": "samsung", "redmi": "xiaomi", "poco": "xiaomi", "reno": "oppo",
+}
+
+_VARIANT = r"(pro\s*max|pro\+|pro|plus|ultra|max|air|mini|lite|fe|neo|edge)"
+# letter after the model number, attached or detached for F / E / T ("11f", "11 F")
+_LETTER = r"(?:[a-z]|\s[fet])?"
+
+# (brand or series key, pattern) -> groups: model[, variant]
+MODEL_RULES: List[Tuple[str, str]] = [
+    ("iphone", rf"iphone\s*(\d{{1,2}}e?|se|xr|xs|x)\b\s*{_VARIANT}?"),
+    ("iphone", r"iphone\s+(air|mini)\b()"),
+    ("galaxy", r"\bz\s*(fold\s*\d|flip\s*\d)\b()"),
+    ("galaxy", rf"\b([asmzf]\s?\d{{1,3}}[a-z]?)\b\s*{_VARIANT}?"),
+    ("redmi", rf"redmi\s+(note\s*\d{{1,2}}{_LETTER}|[a-z]?\d{{1,2}}{_LETTER})\b\s*{_VARIANT}?"),
+    ("poco", rf"poco\s+([a-z]\d{{1,2}})\b\s*{_VARIANT}?"),
+    ("reno", rf"reno\s*(\d{{1,2}}{_LETTER})\b\s*{_VARIANT}?"),
+    ("realme", rf"realme\s+((?:note\s*)?[a-z]{{0,2}}\s?\d{{1,3}}{_LETTER})\b\s*{_VARIANT}?"),
+    ("pixel", rf"pixel\s+(\d{{1,2}}a?)\b\s*{_VARIANT}?"),
+    # phones named by a series word + number ("Hot 40", "Nova 11i", "Camon 20")
+    ("infinix", rf"\b((?:hot|note|zero|smart)\s*\d{{1,3}}{_LETTER})\b\s*{_VARIANT}?"),
+    ("huawei", rf"\b((?:nova|mate|pura)\s*\d{{1,3}}{_LETTER})\b\s*{_VARIANT}?"),
+    ("honor", rf"\b(magic\s*\d{{1,2}}{_LETTER})\b\s*{_VARIANT}?"),
+    ("tecno", rf"\b((?:camon|spark|pova|pop)\s*\d{{1,3}}{_LETTER})\b\s*{_VARIANT}?"),
+    ("motorola", rf"\b(edge\s*\d{{1,3}}{_LETTER})\b\s*{_VARIANT}?"),
+    ("oneplus", rf"\b(nord\s*(?:ce\s*)?\d{{1,2}}{_LETTER})\b\s*{_VARIANT}?"),
+]
+# series words tidied as "Hot 40" (word + number) rather than "HOT 40"
+SERIES_WORDS = ("note", "hot", "zero", "smart", "nova", "mate", "pura", "magic",
+                "camon", "spark", "pova", "pop", "edge", "nord")
+# any brand: a short letters+digits code (S23, C67, Y04, 13F), as the stores used
+GENERIC_MODEL = rf"\b([a-z]{{1,2}}\d{{1,3}}[a-z+]{{0,4}})\b\s*{_VARIANT}?"
+# last resort: a number right after the brand ("oneplus 12", "xiaomi 14t pro")
+BRAND_NUMBER = rf"(?<![a-z0-9])(?:%s)\s+(\d{{1,3}}{_LETTER})\b\s*{_VARIANT}?"
+# tablet marker -> how it leads the model, in priority order ("tablet" alone reads as Tab)
+TABLET_WORDS: Dict[str, str] = {"ipad": "iPad", "matepad": "MatePad", "tab": "Tab", "pad": "Pad", "tablet": "Tab"}
+# a tablet without a brand/series model: the number after its marker ("MatePad 11", "Redmi Pad 2")
+TABLET_NUMBER = rf"\b(?:matepad|pad|tab)\s*(\d{{1,2}}{_LETTER})\b\s*{_VARIANT}?"
+
+# ---------------- Compiled ----------------
+
+_ALIAS = TokenMapper(ALIASES, whole_words=True)
+_TOKENS = sorted({t for _, toks in BRANDS for t in toks}, key=len, reverse=True)
+_TOKEN_SET = frozenset(_TOKENS)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_RULES: Dict[str, List[re.Pattern]] = {}
+for _key, _pat in MODEL_RULES:
+    _RULES.setdefault(_key, []).append(re.compile(_pat))
+_GENERIC_RE = re.compile(GENERIC_MODEL)
+_BRAND_NUMBER_RE = re.compile(BRAND_NUMBER % "|".join(map(re.escape, _TOKENS)))
+_TABLET_NUMBER_RE = re.compile(TABLET_NUMBER)
+
+# one pass for all memory figures: "256 gb", "1 tb", "8 gb ram", "ram 8 gb"
+_MEM_RE = re.compile(r"(\d{1,4})\s?(gb|tb)(\s?ram)?|ram\s?(\d{1,2})\s?gb")
+# "12GB 256GB" / "8GB+256GB": the smaller figure right before the storage is RAM
+_MEM_PAIR_RE = re.compile(r"(?<!\d)(\d{1,2})\s?gb\s?[+/]?\s?(\d{1,4})\s?(gb|tb)")
+_DUAL_RE = re.compile(r"dual[\s-]?sim|dual\s?/\s?sim")
+
+
+@dataclass(frozen=True)
+class PhoneSpec:
+    brand: str = ""                # canonical lower-case brand ("apple", "samsung", ...)
+    series: Optional[str] = None   # galaxy / redmi / poco / reno / ipad
+    model: str = ""                # "13", "A55", "Note 13", "Z Fold5"
+    variant: str = ""              # "Pro Max", "Ultra", "FE", ...
+    storage_gb: Optional[int] = None
+    ram_gb: Optional[int] = None
+    is_5g: bool = False
+    dual_sim: bool = False
+    tablet: bool = False           # iPad / Galaxy Tab / ... (model starts with the marker)
+
+    @property
+    def full_model(self) -> str:
+        return f"{self.model} {self.variant}".strip()
+
+    @property
+    def storage(self) -> str:
+        if not self.storage_gb:
+            return ""
+        if self.storage_gb >= 1024 and self.storage_gb % 1024 == 0:
+            return f"{self.storage_gb // 1024}TB"
+        return f"{self.storage_gb}GB"
+
+    @property
+    def suffix(self) -> str:
+        parts = []
+        if self.ram_gb:
+            parts.append(f"{self.ram_gb}GB RAM")
+        if self.storage_gb:
+            parts.append(self.storage)
+        if self.is_5g:
+            parts.append("5G")
+        if self.dual_sim:
+            parts.append("Dual SIM")
+        return " / ".join(parts)
+
+
+def prepare(title: str) -> str:
+    """Folded, lower-cased title with Arabic tokens mapped to English."""
+    return _ALIAS(normalize_lower(title)).lower()
+
+
+def _pick_brand(found: set) -> Tuple[str, Optional[str]]:
+    for token, brand in SERIES.items():
+        if token in found:
+            return brand, token
+    for brand, tokens in BRANDS:
+        if any(t in found for t in tokens):
+            return brand, None
+    return "", None
+
+
+def _model(text: str, keys: List[str]) -> Tuple[str, str]:
+    for key in keys:
+        for rx in _RULES.get(key, ()):
+            m = rx.search(text)
+            if m:
+                return m.group(1), m.group(2) or ""
+    for rx in (_GENERIC_RE, _BRAND_NUMBER_RE):
+        m = rx.search(text)
+        if m:
+            return m.group(1), m.group(2) or ""
+    return "", ""
+
+
+def _tidy_model(model: str) -> str:
+    model = re.sub(r"(\d) ([a-z])$", r"\1\2", re.sub(r"\s+", " ", model).strip())   # 11 f -> 11f
+    if re.fullmatch(r"[a-z]\s?\d.*", model):          # a 55 -> A55
+        return model.replace(" ", "").upper()
+    if model.startswith(SERIES_WORDS + ("fold", "flip")):   # note13 -> Note 13, fold5 -> Z Fold5
+        word, num = re.match(r"([a-z]+)\s*(.*)", model).groups()
+        return (f"Z {word.title()}{num}" if word in ("fold", "flip") else f"{word.title()} {num.upper()}").strip()
+    return model.upper() if any(c.isdigit() for c in model) else model.title()
+
+
+def _tidy_variant(variant: str) -> str:
+    variant = re.sub(r"\s+", " ", variant).strip()
+    return {"fe": "FE", "pro+": "Pro+"}.get(variant, variant.title())
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def extract(title: str) -> PhoneSpec:
+    """Parse a product title into a PhoneSpec (memoized on the raw title)."""
+    t = prepare(title)
+    words = set(_WORD_RE.findall(t))
+    found = words & _TOKEN_SET
+    brand, series = _pick_brand(found)
+
+    keys = [k for k in ("iphone", "galaxy", "redmi", "poco", "reno", "realme", "pixel") if k in found]
+    keys.append(brand)
+    model, variant = _model(t, keys) if brand else ("", "")
+    tablet = next((label for word, label in TABLET_WORDS.items() if word in words), "")
+    if tablet and brand and not model:
+        m = _TABLET_NUMBER_RE.search(t)
+        if m:
+            model, variant = m.group(1), m.group(2) or ""
+    model = _tidy_model(model) if model else ""
+    if tablet and model:
+        model = f"{tablet} {model}"
+
+    rams, caps = [], []
+    for num, unit, ram_after, ram_before in _MEM_RE.findall(t):
+        if ram_before:
+            rams.append(int(ram_before))
+        elif ram_after and unit == "gb" and len(num) <= 2:
+            rams.append(int(num))
+        elif unit == "gb" and len(num) >= 2:
+            caps.append(int(num))
+        elif unit == "tb" and len(num) <= 2:
+            caps.append(int(num) * 1024)
+    if not rams:
+        for ram, cap, unit in _MEM_PAIR_RE.findall(t):
+            if int(ram) <= 24 and int(ram) < int(cap) * (1024 if unit == "tb" else 1):
+                rams.append(int(ram))
+    # a RAM figure written apart from "ram" ("ram 12 gb ... 12 gb") is not storage
+    caps = [c for c in caps if c not in rams]
+    return PhoneSpec(
+        brand=brand, series=series,
+        model=model,
+        variant=_tidy_variant(variant) if variant else "",
+        storage_gb=max(caps) if caps else None,
+        ram_gb=max(rams) if rams else None,
+        is_5g="5g" in words,
+        dual_sim="ds" in words or ("dual" in words and bool(_DUAL_RE.search(t))),
+        tablet=bool(tablet),
+    )
+
+
+# ---------------- Store column formats ----------------
+# Amazon and Noon keep the brand_or_model / model / suffix columns they always
+# wrote: the brand label in the title's own language (or Noon's series name), the
+# first letters+digits code as model and only Pro / Pro+ / برو as suffix. Brand
+# keywords match whole words, so "ابل" no longer fires inside "قابل" / "كابل".
+
+# (keyword, label) in priority order: the first keyword found in the title wins
+_COMMON_BRAND_LABELS: List[Tuple[str, str]] = [
+    ("سامسونج", "سامسونج"), ("samsung", "Samsung"),
+    ("هواوي", "هواوي"), ("huawei", "Huawei"),
+    ("شاومي", "شاومي"), ("xiaomi", "Xiaomi"),
+    ("اوبو", "اوبو"), ("oppo", "Oppo"),
+    ("فيفو", "فيفو"), ("vivo", "Vivo"),
+    ("نوكيا", "نوكيا"), ("nokia", "Nokia"),
+    ("سوني", "سوني"), ("sony", "Sony"),
+    ("جوجل", "جوجل"), ("google", "Google Pixel"),
+    ("موتورولا", "موتورولا"), ("motorola", "Motorola"),
+    ("ون بلس", "ون بلس"), ("oneplus", "OnePlus"),
+    ("ال جي", "ال جي"), ("lg", "LG"),
+]
+AMAZON_BRAND_LABELS: List[Tuple[str, str]] = (
+    [("ايفون", "ايفون"), ("apple", "Apple"), ("ابل", "Apple"),
+     ("سامسونج", "سامسونج"), ("samsung", "Samsung"), ("ريلمي", "ريلمي"), ("realme", "Realme")]
+    + _COMMON_BRAND_LABELS[2:]
+    + [("بوكو", "بوكو"), ("poco", "Poco")]
+)
+NOON_BRAND_LABELS: List[Tuple[str, str]] = (
+    [("ايباد", "ايباد"), ("ipad", "ايباد"), ("ايفون", "ايفون"), ("iphone", "ايفون"),
+     ("بوكو", "بوكو"), ("poco", "بوكو"), ("ريدمي", "ريدمي"), ("redmi", "ريدمي"),
+     ("ريلمي", "ريلمي"), ("ريل مي", "ريلمي"), ("realme", "ريلمي"), ("ابل", "Apple")]
+    + _COMMON_BRAND_LABELS
+)
+# 2-letter+digits product code ("S23", "C53", "A55") as both stores took it
+_CODE_RE = re.compile(r"\b([a-zA-Z]{1,2}\d{1,3}[a-zA-Z+]{0,4})\b", re.IGNORECASE)
+_AMAZON_SUFFIX_RE = re.compile(r"\b(pro|برو)\b", re.IGNORECASE)
+_NOON_SUFFIX_RE = re.compile(r"\b(pro\+?|برو)\b", re.IGNORECASE)
+_AR_A_MODEL_RE = re.compile(r"\bايه\s*(\d{1,3})\b")          # "ايه 55" -> A55
+_AR_NOTE_RE = re.compile(r"نوت\s*(\d{1,3})")                  # redmi "نوت 13" -> Note13
+_REALME_NUMBER_RE = re.compile(r"(?:ريلمي|realme).*?(\d{2})", re.IGNORECASE)
+
+
+def _label_matcher(labels: List[Tuple[str, str]]):
+    """title -> label of the first table keyword present as a whole word, else "Unknown"."""
+    rank = {kw: i for i, (kw, _) in reversed(list(enumerate(labels)))}
+    alt = "|".join(map(re.escape, sorted(rank, key=len, reverse=True)))
+    rx = re.compile(rf"(?<![^\W\d_])(?:{alt})(?![^\W\d_])")
+
+    def match(title: str) -> str:
+        found = rx.findall(normalize_lower(title))
+        return labels[min(rank[kw] for kw in found)][1] if found else "Unknown"
+    return match
+
+
+_amazon_label = _label_matcher(AMAZON_BRAND_LABELS)
+_noon_label = _label_matcher(NOON_BRAND_LABELS)
+
+
+def _suffix(rx: re.Pattern, title: str) -> str:
+    m = rx.search(title)
+    return m.group(1).capitalize() if m else ""
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def amazon_columns(title: str) -> Tuple[str, Optional[str], str]:
+    """(brand_or_model, model, suffix) as Amazon stores them: ("Samsung", "A55", "Pro")."""
+    t = normalize_arabic(title)
+    suffix = _suffix(_AMAZON_SUFFIX_RE, t)
+    m = _AR_A_MODEL_RE.search(t)
+    if m:
+        model = f"A{m.group(1)}"
+    elif "ريدمي" in t and _AR_NOTE_RE.search(t):
+        model = f"Note{_AR_NOTE_RE.search(t).group(1)}"
+        suffix = suffix or "نوت"
+    else:
+        m = _CODE_RE.search(t)
+        model = m.group(1).upper() if m else None
+    return _amazon_label(title), model, suffix
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def noon_columns(title: str) -> Tuple[str, Optional[str], str]:
+    """(brand_or_model, model, suffix) as Noon stores them: ("ريدمي", "13", "Pro+")."""
+    t = normalize_arabic(title)
+    suffix = _suffix(_NOON_SUFFIX_RE, t)
+    m = _REALME_NUMBER_RE.search(t) or _CODE_RE.search(t)
+    model = (m.group(1) if m.re is _REALME_NUMBER_RE else m.group(1).upper()) if m else None
+    return _noon_label(title), model, suffix
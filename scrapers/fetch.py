@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Shared HTTP fetch layer for the requests-based scrapers (Amazon, Noon, 2B).
+
+- fetch_text(): one GET with the retry / 403 / Cloudflare 52x handling that
+  2B has always used (UA rotation + optional language flip on 403, linear backoff).
+- paced_get(): every GET goes through the host's adaptive rate limiter
+  (ratelimit.py) and reports back how the store answered: 403 / 429 / 503 and
+  Cloudflare 52x slow the host down, successful responses speed it up again.
+- FetchEngine: asyncio front-end that runs many fetches at once over one shared
+  connection pool, with a per-host concurrency cap; the limiter keeps the rate polite.
+- With SCRAPER_HTTP_CACHE=1, fetch_text() goes through the on-disk response cache
+  (http_cache.py): fresh pages come from disk, stale ones are revalidated with
+  ETag / Last-Modified; pages served from disk do not use the rate limit.
+
+The blocking requests calls run on a small thread pool; the event loop only
+schedules them, so a keyword x page grid is fetched concurrently without
+changing the HTTP stack the scrapers already use.
+"""
+import time, random, asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from http_cache import get_cache
+from ratelimit import limiter_for, retry_after
+
+UA_POOL = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Safari/605.1.15",
+]
+
+CF_RETRY_STATUSES = (520, 521, 522, 523, 524)    # Cloudflare oddities: back off and retry
+SOFT_FAIL_STATUSES = (403, 404, 429, 503)         # back off and retry (404 gives up at once)
+# The store is pushing back: the host's limiter slows down
+THROTTLE_STATUSES = CF_RETRY_STATUSES + tuple(s for s in SOFT_FAIL_STATUSES if s != 404)
+
+
+def rotate_user_agent(session: requests.Session):
+    session.headers.update({"User-Agent": random.choice(UA_POOL)})
+
+
+def paced_get(session: requests.Session, url: str, timeout: int = 25,
+              headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    """session.get() at the host's current rate, feeding the status back to its limiter."""
+    limiter = limiter_for(url)
+    sent = limiter.acquire()
+    r = session.get(url, timeout=timeout, allow_redirects=True, headers=headers)
+    if r.status_code in THROTTLE_STATUSES:
+        limiter.throttled(sent, retry_after(r.headers))
+    elif r.status_code < 400:
+        limiter.success()
+    return r
+
+
+def fetch_text(session: requests.Session, url: str, tries: int = 4, timeout: int = 25,
+               flip_url: Optional[Callable[[str], Optional[str]]] = None,
+               on_403: Optional[Callable[[requests.Session], None]] = rotate_user_agent,
+               cacheable: Optional[Callable[[str], bool]] = None,
+               on_404: Optional[Callable[[str], None]] = None) -> Optional[str]:
+    """Fetch with retries, UA rotation and an optional alternate URL on 403.
+
+    Returns the body text, or None on 404 / when all tries are exhausted; on_404(url)
+    is called in the first case, for callers that must tell the two apart. Backoff
+    on throttling statuses is the host limiter's: the next try waits for its token.
+
+    With the HTTP cache on, a body is stored under the URL it was actually fetched
+    from (the alternate one after a 403 flip), and only if `cacheable(body)` agrees,
+    so callers can keep 200 block / captcha pages out of the cache.
+    """
+    cache = get_cache()
+    conditional: Dict[str, str] = {}
+    if cache is not None:
+        text = cache.fresh(url)
+        if text is not None:
+            return text
+        conditional = cache.validators(url)
+    for attempt in range(1, tries + 1):
+        try:
+            fetched = url
+            r = paced_get(session, url, timeout=timeout, headers=conditional or None)
+            if r.status_code == 304 and cache is not None:
+                text = cache.revalidated(url)
+                if text is not None:
+                    return text
+                conditional = {}   # stored body is gone: ask for the full page
+                continue
+            if r.status_code == 403:
+                # rotate identity, then try the alternate URL (e.g. other language) once
+                if on_403:
+                    on_403(session)
+                alt = flip_url(url) if flip_url else None
+                if alt:
+                    fetched = alt
+                    r = paced_get(session, alt, timeout=timeout)
+            if r.status_code in CF_RETRY_STATUSES:
+                continue
+            r.raise_for_status()
+            if cache is not None and (cacheable is None or cacheable(r.text)):
+                cache.store(fetched, r.text, r.headers)
+            return r.text
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code in SOFT_FAIL_STATUSES:
+                # do not loop forever on 404, just break so caller can handle
+                if e.response.status_code == 404:
+                    if on_404:
+                        on_404(fetched)
+                    return None
+                continue
+            raise
+        except requests.RequestException:
+            time.sleep(0.8 * attempt)
+            continue
+    return None
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+# ---------------- Async engine ----------------
+
+class FetchEngine:
+    """Concurrent fetcher over one requests.Session.
+
+    `fetch` is the blocking single-URL function to run (defaults to fetch_text on
+    `session`), so stores with their own pre/post steps (2B warmup) can plug in.
+    `rate` is the starting req/s of each host's limiter, if the engine creates it.
+    Create one engine per event loop (i.e. inside the coroutine passed to asyncio.run).
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None, per_host: int = 2,
+                 rate: Optional[float] = None, max_workers: int = 8,
+                 fetch: Optional[Callable[[str], Optional[str]]] = None, **fetch_kwargs):
+        if fetch is None:
+            if session is None:
+                raise ValueError("FetchEngine needs a session or a fetch callable")
+            fetch = lambda url: fetch_text(session, url, **fetch_kwargs)
+        self._fetch = fetch
+        self.per_host = max(1, per_host)
+        self.rate = rate
+        self._gates: Dict[str, asyncio.Semaphore] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max(max_workers, self.per_host),
+                                        thread_name_prefix="fetch")
+        self.requests = 0
+        self.failures = 0
+
+    def _gate(self, url: str) -> asyncio.Semaphore:
+        host = host_of(url)
+        gate = self._gates.get(host)
+        if gate is None:
+            limiter_for(url, rate=self.rate)   # pacing happens in the worker, per request
+            gate = self._gates[host] = asyncio.Semaphore(self.per_host)
+        return gate
+
+    async def fetch(self, url: str) -> Optional[str]:
+        cache = get_cache()
+        if cache is not None:
+            text = cache.fresh(url)
+            if text is not None:   # served from disk: no request, no pacing
+                return text
+        async with self._gate(url):
+            loop = asyncio.get_running_loop()
+            self.requests += 1
+            try:
+                text = await loop.run_in_executor(self._pool, self._fetch, url)
+            except Exception as e:
+                print(f"[fetch] {url} failed: {e}")
+                text = None
+            if text is None:
+                self.failures += 1
+            return text
+
+    async def fetch_all(self, urls: Iterable[str]) -> List[Optional[str]]:
+        """Fetch many URLs concurrently; results keep the input order."""
+        return list(await asyncio.gather(*(self.fetch(u) for u in urls)))
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
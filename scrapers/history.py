@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Local price history: every scraped row appended to a date-partitioned Parquet dataset.
+
+  data/history/date=2026-10-16/store=noon/part-<run>-0000.parquet
+
+Supabase keeps the latest row per product (and the price index skips unchanged
+ones), so day-by-day prices live here instead. BatchWriter taps rows just before
+the price-index filter, so every observation is kept, with canonical_id already
+set. Each run adds new part files; nothing is rewritten.
+
+Columns are compact: canonical_id / brand_or_model / model / suffix / category /
+query are dictionary-encoded, price is float32, observed_at a UTC timestamp;
+date and store come from the (hive) partition path. Read it with e.g.
+
+  pyarrow.dataset.dataset("data/history", partitioning="hive").to_table(
+      filter=pyarrow.dataset.field("canonical_id") == "apple-13-128gb")
+
+pyarrow is optional; without it the history is skipped (with one notice).
+
+ENV (optional):
+  SCRAPER_HISTORY_DIR=data/history
+  SCRAPER_HISTORY_FLUSH_ROWS=20000   rows buffered before part files are written
+  SCRAPER_HISTORY=0                  disable
+"""
+import os, re, time, atexit, threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:
+    pa = pq = None
+
+DEFAULT_DIR = os.getenv("SCRAPER_HISTORY_DIR", os.path.join("data", "history"))
+DEFAULT_FLUSH_ROWS = int(os.getenv("SCRAPER_HISTORY_FLUSH_ROWS", "20000"))
+
+DICT_COLUMNS = ["canonical_id", "brand_or_model", "model", "suffix", "category", "query"]
+TEXT_COLUMNS = ["title", "link"]
+
+
+def history_schema():
+    labels = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [("observed_at", pa.timestamp("s", tz="UTC"))]
+        + [(c, labels) for c in DICT_COLUMNS]
+        + [(c, pa.string()) for c in TEXT_COLUMNS]
+        + [("price", pa.float32())]
+    )
+
+
+def _partition_value(value: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", value).strip("_") or "unknown"
+
+
+def _price(value) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+class HistoryWriter:
+    """Buffers rows per store and writes them as Parquet part files. Thread-safe."""
+
+    def __init__(self, root: str = DEFAULT_DIR, flush_rows: int = DEFAULT_FLUSH_ROWS):
+        if pa is None:
+            raise RuntimeError("pyarrow is not installed")
+        self.root = root
+        self.flush_rows = max(1, flush_rows)
+        started = datetime.now(timezone.utc)
+        self.date = started.date().isoformat()   # one partition per run, even past midnight
+        self.run_id = f"{started:%H%M%S}-{os.getpid()}"
+        self.schema = history_schema()
+        self._buf: Dict[str, List[Tuple[int, Dict]]] = {}
+        self._pending = 0
+        self._parts = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self.rows = 0
+        self.files = 0
+        atexit.register(self.close)
+
+    def add(self, rows: Sequence[Dict]):
+        now = int(time.time())
+        with self._lock:
+            if self._closed:
+                return
+            for row in rows:
+                self._buf.setdefault(str(row.get("store") or ""), []).append((now, row))
+            self._pending += len(rows)
+            if self._pending >= self.flush_rows:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._flush_locked()
+        if self.rows:
+            print(f"🗄️ history: {self.rows} rows in {self.files} files under "
+                  f"{os.path.join(self.root, 'date=' + self.date)}")
+
+    def _flush_locked(self):
+        buf, self._buf, self._pending = self._buf, {}, 0
+        for store, items in buf.items():
+            try:
+                self._write(store, items)
+            except Exception as e:
+                print(f"[!] history: writing {len(items)} {store} rows failed: {e}")
+
+    def _write(self, store: str, items: List[Tuple[int, Dict]]):
+        cols = {"observed_at": [t for t, _ in items]}
+        for c in DICT_COLUMNS + TEXT_COLUMNS:
+            cols[c] = [(str(r[c]) if r.get(c) is not None else None) for _, r in items]
+        cols["price"] = [_price(r.get("price")) for _, r in items]
+        table = pa.Table.from_pydict(cols, schema=self.schema)
+        folder = os.path.join(self.root, f"date={self.date}", f"store={_partition_value(store)}")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"part-{self.run_id}-{self._parts:04d}.parquet")
+        pq.write_table(table, path, compression="zstd")
+        self._parts += 1
+        self.files += 1
+        self.rows += len(items)
+
+
+_HISTORY: Optional[HistoryWriter] = None
+_HISTORY_LOCK = threading.Lock()
+_WARNED = False
+
+
+def get_history() -> Optional[HistoryWriter]:
+    """Process-wide history writer, or None when SCRAPER_HISTORY=0 or pyarrow is missing."""
+    global _HISTORY, _WARNED
+    if os.getenv("SCRAPER_HISTORY", "1").strip() in ("0", "false", "no", "off"):
+        return None
+    with _HISTORY_LOCK:
+        if pa is None:
+            if not _WARNED:
+                print("[i] pyarrow not installed; local price history disabled.")
+                _WARNED = True
+            return None
+        if _HISTORY is None:
+            _HISTORY = HistoryWriter()
+        return _HISTORY
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+One place where every scraper turns HTML into a BeautifulSoup tree.
+
+The stores all read pages through the BeautifulSoup API (find_all / select /
+get_text), so the backend is BeautifulSoup's tree builder: "lxml" (libxml2, C)
+when it is installed, otherwise the pure-Python "html.parser" the scrapers
+always used. The choice is made once per process and can be forced with an env
+flag; an unavailable backend falls back to html.parser with a warning.
+
+The stores only read their result grids, so each passes a strainer (`only=`)
+and the tree is built just for those nodes; everything else on the page
+(scripts, nav, footers) is tokenized and dropped. html5lib ignores strainers.
+
+ENV (optional):
+  SCRAPER_HTML_PARSER=lxml     lxml | html.parser | html5lib
+"""
+import os, re
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+
+BACKENDS = ["lxml", "html.parser", "html5lib"]
+FALLBACK = "html.parser"
+
+_checked: Dict[str, bool] = {}
+
+
+def available(backend: str) -> bool:
+    """True if BeautifulSoup can build trees with `backend` here."""
+    ok = _checked.get(backend)
+    if ok is None:
+        try:
+            BeautifulSoup("<p></p>", backend)
+            ok = True
+        except FeatureNotFound:
+            ok = False
+        _checked[backend] = ok
+    return ok
+
+
+def available_backends() -> List[str]:
+    return [b for b in BACKENDS if available(b)]
+
+
+def pick_backend(name: Optional[str] = None) -> str:
+    wanted = (name or os.getenv("SCRAPER_HTML_PARSER", "lxml")).strip().lower()
+    if wanted not in BACKENDS:
+        raise ValueError(f"unknown HTML parser {wanted!r}; expected one of {', '.join(BACKENDS)}")
+    if available(wanted):
+        return wanted
+    print(f"[html] parser {wanted!r} not installed, using {FALLBACK}")
+    return FALLBACK
+
+
+_BACKEND: Optional[str] = None
+
+
+def default_backend() -> str:
+    global _BACKEND
+    if _BACKEND is None:
+        _BACKEND = pick_backend()
+    return _BACKEND
+
+
+def parse_html(markup, backend: Optional[str] = None, only: Optional[SoupStrainer] = None,
+               **kwargs) -> BeautifulSoup:
+    """BeautifulSoup(markup) with the configured backend (or an explicit one).
+
+    With `only`, just the matching elements (and their subtrees) are kept.
+    """
+    if only is not None:
+        kwargs["parse_only"] = only
+    return BeautifulSoup(markup, backend or default_backend(), **kwargs)
+
+
+# ---------------- Result-grid strainers ----------------
+
+def only_classes(*classes: str, tags=None) -> SoupStrainer:
+    """Keep elements (optionally only `tags`) carrying any of `classes`."""
+    # While parsing, class is still the raw "a b c" string, so match whole words in it
+    words = re.compile(r"(?:^|\s)(?:%s)(?:\s|$)" % "|".join(map(re.escape, classes)))
+    return SoupStrainer(tags, attrs={"class": words})
+
+
+AMAZON_RESULTS = SoupStrainer("div", attrs={"data-component-type": "s-search-result"})
+NOON_RESULTS = only_classes("ProductDetailsSection_title__JorAV", "Price_amount__2sXa7", tags=["h2", "strong"])
+JUMIA_RESULTS = only_classes("name", "prc", tags=["h3", "div"])
+# 2B (Magento): the product list containers, or the cards themselves when there is no container
+TWOB_CARDS = only_classes("products", "product-items", "product-item", "product")
+# category pages also need the pager for the next-page link
+TWOB_CATEGORY = only_classes("products", "product-items", "product-item", "product", "pages", "pagination")
+
+STRAINERS: Dict[str, SoupStrainer] = {
+    "amazon": AMAZON_RESULTS,
+    "noon": NOON_RESULTS,
+    "jumia": JUMIA_RESULTS,
+    "2b": TWOB_CARDS,
+}
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk HTTP response cache for the fetch layer (reruns and parser development).
+
+Pages fetched by fetch_text() are kept under .cache/http/:
+- bodies are gzip files named by the SHA-256 of their content (content-addressed,
+  so identical pages reached through different URLs are stored once);
+- an SQLite index maps each URL to its body plus the ETag / Last-Modified the
+  server sent and when it was last confirmed.
+
+Within the TTL a page is served from disk without touching the network (and
+without the per-host pacing). After the TTL the next request is conditional
+(If-None-Match / If-Modified-Since); a 304 reuses the stored body and restarts
+the TTL, anything else replaces it. Entries not confirmed for KEEP_DAYS are pruned
+when the cache is opened.
+
+Keys are URLs only: the stores put the language in the URL (2B, Noon) or always
+send the same Accept-Language (Amazon).
+
+Off by default; a rerun of a failed nightly job or a local parser session turns
+it on with SCRAPER_HTTP_CACHE=1.
+
+ENV (optional):
+  SCRAPER_HTTP_CACHE=1              enable
+  SCRAPER_HTTP_CACHE_DIR=.cache/http
+  SCRAPER_HTTP_CACHE_TTL=21600      seconds a page is served without asking the server
+  SCRAPER_HTTP_CACHE_KEEP_DAYS=3    drop entries not confirmed for this long
+"""
+import os, gzip, time, atexit, sqlite3, hashlib, threading
+from typing import Dict, Optional, Tuple
+
+DEFAULT_DIR = os.getenv("SCRAPER_HTTP_CACHE_DIR", os.path.join(".cache", "http"))
+DEFAULT_TTL = float(os.getenv("SCRAPER_HTTP_CACHE_TTL", "21600"))
+DEFAULT_KEEP_DAYS = float(os.getenv("SCRAPER_HTTP_CACHE_KEEP_DAYS", "3"))
+
+
+class HttpCache:
+    """URL -> gzip body + validators. Thread-safe; shared by every fetch in the process."""
+
+    def __init__(self, root: str = DEFAULT_DIR, ttl: float = DEFAULT_TTL,
+                 keep_days: float = DEFAULT_KEEP_DAYS):
+        self.root = root
+        self.ttl = ttl
+        self.keep = keep_days * 86400
+        self._bodies = os.path.join(root, "bodies")
+        os.makedirs(self._bodies, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(root, "index.sqlite"), check_same_thread=False, timeout=30)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                validated_at REAL NOT NULL
+            )""")
+        self._db.commit()
+        self.hits = self.revalidations = self.stores = 0
+        self.prune()
+        atexit.register(self.report)
+
+    # ---- bodies ----
+    def _body_path(self, digest: str) -> str:
+        return os.path.join(self._bodies, digest[:2], digest + ".gz")
+
+    def _read_body(self, digest: str) -> Optional[str]:
+        try:
+            with gzip.open(self._body_path(digest), "rb") as f:
+                return f.read().decode("utf-8")
+        except (OSError, EOFError):
+            return None
+
+    def _write_body(self, text: str) -> str:
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._body_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp, "wb", compresslevel=6) as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return digest
+
+    def _entry(self, url: str) -> Optional[Tuple[str, Optional[str], Optional[str], float]]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT body, etag, last_modified, validated_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+
+    # ---- public API ----
+    def fresh(self, url: str) -> Optional[str]:
+        """Body of a cached page still within the TTL, else None."""
+        hit = self._entry(url)
+        if hit is None or time.time() - hit[3] >= self.ttl:
+            return None
+        text = self._read_body(hit[0])
+        if text is not None:
+            with self._lock:
+                self.hits += 1
+        return text
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Conditional-request headers for a cached (stale) page; {} when there is none."""
+        hit = self._entry(url)
+        if hit is None:
+            return {}
+        headers = {}
+        if hit[1]:
+            headers["If-None-Match"] = hit[1]
+        if hit[2]:
+            headers["If-Modified-Since"] = hit[2]
+        return headers
+
+    def revalidated(self, url: str) -> Optional[str]:
+        """The server answered 304: restart the TTL and return the stored body."""
+        hit = self._entry(url)
+        text = self._read_body(hit[0]) if hit else None
+        if text is None:
+            return None
+        with self._lock:
+            self._db.execute("UPDATE responses SET validated_at = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+            self.revalidations += 1
+        return text
+
+    def store(self, url: str, text: str, headers=None):
+        """Remember a 200 response body and its validators."""
+        headers = headers or {}
+        digest = self._write_body(text)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (url, body, etag, last_modified, validated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, digest, headers.get("ETag"), headers.get("Last-Modified"), time.time()))
+            self._db.commit()
+            self.stores += 1
+
+    def prune(self):
+        """Drop entries older than keep_days and bodies no entry points to."""
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE validated_at < ?", (time.time() - self.keep,))
+            self._db.commit()
+            live = {row[0] for row in self._db.execute("SELECT DISTINCT body FROM responses")}
+        for folder, _, files in os.walk(self._bodies):
+            for name in files:
+                if name.endswith(".gz") and name[:-3] not in live:
+                    try:
+                        os.remove(os.path.join(folder, name))
+                    except OSError:
+                        pass
+
+    def summary(self) -> str:
+        return (f"🗃️ http cache: {self.hits} served from disk, {self.revalidations} revalidated (304), "
+                f"{self.stores} stored")
+
+    def report(self):
+        if self.hits or self.revalidations or self.stores:
+            print(self.summary())
+
+
+_CACHE: Optional[HttpCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_cache() -> Optional[HttpCache]:
+    """Process-wide cache when SCRAPER_HTTP_CACHE is on, else None."""
+    global _CACHE
+    if os.getenv("SCRAPER_HTTP_CACHE", "0").strip() not in ("1", "true", "yes", "on"):
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = HttpCache()
+        return _CACHE
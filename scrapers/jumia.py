@@ -1,13 +1,15 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
-import time
-import re
+import asyncio
+import threading
+from contextlib import ExitStack
 from supabase import create_client, Client
 import os, sys
-import chromedriver_autoinstaller
+from supabase_writer import products_writer
+from browser_pool import get_pool
+from sessions import get_session
+from fetch import fetch_text, FetchEngine
+from html_parser import parse_html, JUMIA_RESULTS
+from textmatch import TermMatcher
 
-chromedriver_autoinstaller.install()
 # Supabase config
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")  # service_role for server-side writes
@@ -17,13 +19,7 @@ if not SUPABASE_URL or not SUPABASE_KEY:
              "Add repo secrets and map them via env in the workflow.")
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-def normalize_arabic(text):
-    text = re.sub(r"[إأآا]", "ا", text)
-    text = re.sub(r"[ى]", "ي", text)
-    text = re.sub(r"[ة]", "ه", text)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+writer = products_writer(supabase, "jumia", mode="upsert")
 
 ACCESSORY_KEYWORDS_AR = [
     "جراب", "كفر", "حماية", "غطاء", "لاصقة", "شاشة", "واقي",
@@ -44,49 +40,135 @@ ACCESSORY_KEYWORDS_EN = [
     "type-c cable", "aux cable", "hdmi cable", "otg cable", "audio cable", "charging dock"
 ]
 
-def is_accessory(title):
-    title_norm = normalize_arabic(title).lower()
-    title_lower = title.lower()
-
-    normalized_keywords_ar = [normalize_arabic(word).lower() for word in ACCESSORY_KEYWORDS_AR]
-    normalized_keywords_en = [word.lower() for word in ACCESSORY_KEYWORDS_EN]
-
-    for word in normalized_keywords_ar:
-        if word in title_norm:
-            return True
-
-    for word in normalized_keywords_en:
-        if word in title_lower:
-            return True
-
-    return False
-
-def search_jumia_fast(product_name, category=""):
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--window-size=1920x1080")
-    driver = webdriver.Chrome(options=options)
+# Arabic and English keywords, normalized and compiled once
+ACCESSORY_MATCHER = TermMatcher(ACCESSORY_KEYWORDS_AR + ACCESSORY_KEYWORDS_EN)
 
+def is_accessory(title):
+    return ACCESSORY_MATCHER.matches(title)
+
+# ---------------- Fetching: plain HTTP first, browser as fallback ----------------
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "ar-EG,ar;q=0.9,en;q=0.8",
+}
+
+# Markers of a challenge / block page instead of a catalog page
+BLOCK_MARKERS = ("captcha", "cf-chl", "challenge-platform", "access denied", "request blocked")
+
+def catalog_url(product_name, page):
+    return f"https://www.jumia.com.eg/ar/catalog/?q={product_name}&page={page}"
+
+def parse_catalog(html):
+    soup = parse_html(html, only=JUMIA_RESULTS)
+    return soup.find_all("h3", class_="name"), soup.find_all("div", class_="prc")
+
+def looks_blocked(html):
+    if not html or len(html) < 2000:
+        return True
+    head = html[:20000].lower()
+    return any(marker in head for marker in BLOCK_MARKERS)
+
+# Pages fetched ahead of the one being processed; pages past the first empty one are cancelled
+PAGE_WINDOW = int(os.getenv("JUMIA_PAGE_WINDOW", "4"))
+START_RATE = 1.3     # req/s to start with (the old per-page sleep); adapts (ratelimit.py)
+
+class PageSource:
+    """Gets catalog pages over HTTP; leases a browser only if a page needs it."""
+
+    def __init__(self, product_name, pool=None):
+        self.product_name = product_name
+        self.pool = pool or get_pool()
+        self.session = get_session("jumia", headers=HEADERS)
+        self._stack = ExitStack()
+        self._browser = None
+        self._browser_lock = threading.Lock()
+        self.http_pages = 0
+        self.browser_pages = 0
+
+    def fetch(self, url):
+        return fetch_text(self.session, url, tries=2, timeout=20,
+                          cacheable=lambda html: not looks_blocked(html))
+
+    def browser_html(self, url, page):
+        # one leased browser per query, shared by the page workers
+        with self._browser_lock:
+            if self._browser is None:
+                self._browser = self._stack.enter_context(self.pool.browser())
+            self._browser.get(url)
+            self._browser.wait_for(["h3.name", "div.prc"], label=f"jumia '{self.product_name}' p{page}")
+            self.browser_pages += 1
+            return self._browser.page_source
+
+    def resolve(self, page, html):
+        """(names, prices) for one catalog page, given its HTTP body (or None)."""
+        if not looks_blocked(html):
+            names, prices = parse_catalog(html)
+            # an empty first page is suspicious (bot wall / client render); later empty pages are the end
+            if names or page > 1:
+                self.http_pages += 1
+                return names, prices
+        print(f"[jumia] p{page}: HTTP response blocked or empty, falling back to browser")
+        return parse_catalog(self.browser_html(catalog_url(self.product_name, page), page))
+
+    def page(self, page):
+        return self.resolve(page, self.fetch(catalog_url(self.product_name, page)))
+
+    def close(self):
+        self._stack.close()
+
+async def _crawl(source, on_page, window):
+    """Fetch up to `window` pages ahead and hand them to on_page() in page order.
+
+    on_page(page, names, prices) returns False at the last page; requests for
+    later pages still queued or in flight are then cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    async with FetchEngine(fetch=source.fetch, per_host=window, rate=START_RATE) as engine:
+        pending = {}
+        next_page = page = 1
+        try:
+            while True:
+                while next_page < page + window:
+                    url = catalog_url(source.product_name, next_page)
+                    pending[next_page] = asyncio.ensure_future(engine.fetch(url))
+                    next_page += 1
+                html = await pending.pop(page)
+                names, prices = await loop.run_in_executor(None, source.resolve, page, html)
+                if not on_page(page, names, prices):
+                    break
+                page += 1
+        finally:
+            # only tasks still queued or in flight count; finished pages are just unused
+            cancelled = sum(task.cancel() for task in pending.values())
+            await asyncio.gather(*pending.values(), return_exceptions=True)
+        print(f"[jumia] '{source.product_name}': {page} pages used, "
+              f"{engine.requests} requested ({cancelled} cancelled)")
+
+def search_jumia_fast(product_name, category="", pool=None, window=PAGE_WINDOW, keep=None):
+    """Search Jumia; rows stream to the writer page by page and are not collected
+    (unless a `keep` list is given). Returns how many were queued."""
+    source = PageSource(product_name, pool)
+    try:
+        queued = _search_jumia(source, product_name, category, window, keep)
+    finally:
+        source.close()
+    print(f"[jumia] pages via HTTP: {source.http_pages}, via browser: {source.browser_pages}")
+    # Wait for the background writer to drain this query's rows
+    writer.flush()
+    print(writer.summary())
+    return queued
+
+def _search_jumia(source, product_name, category, window=PAGE_WINDOW, keep=None):
     print(f"[🔍] Searching Jumia for: {product_name}")
 
-    all_products = []
+    queued = 0
     seen_titles = set()
-    base_url = f"https://www.jumia.com.eg/ar/catalog/?q={product_name}"
-    page = 1
-
-    while True:
-        url = f"{base_url}&page={page}"
-        driver.get(url)
-        time.sleep(2)
-
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        product_names = soup.find_all("h3", class_="name")
-        product_prices = soup.find_all("div", class_="prc")
 
+    def on_page(page, product_names, product_prices):
+        nonlocal queued
         if not product_names or len(product_prices) < 5:
-            break
-
+            return False
         print(f"✅ Page {page} scraped with {len(product_names)} items.")
 
         for i in range(min(len(product_names), len(product_prices))):
@@ -105,36 +187,27 @@ def search_jumia_fast(product_name, category=""):
             except:
                 price = 0.0
 
-            all_products.append({
+            queued += 1
+            if keep is not None:
+                keep.append({"title": title, "price": price})
+            print(f"{queued}. السعر: {price} جنيه")
+            print(f"   الاسم: {title}")
+            print("-" * 80)
+
+            # Queue for Supabase (written in the background)
+            writer.add({
+                "store": "jumia",
                 "title": title,
-                "price": price
+                "price": price,
+                "category": category,
+                "query": product_name
             })
+        return True
 
-        page += 1
-
-    driver.quit()
-
-    print(f"\n✅ Found {len(all_products)} total products on Jumia for '{product_name}':")
-    print("-" * 80)
-    for i, product in enumerate(all_products, 1):
-        print(f"{i}. السعر: {product['price']} جنيه")
-        print(f"   الاسم: {product['title']}")
-        print("-" * 80)
-
-    # Upload to Supabase
-    if all_products:
-        data_to_insert = [{
-            "store": "jumia",
-            "title": p["title"],
-            "price": p["price"],
-            "category": category,
-            "query": product_name
-        } for p in all_products]
-
-        supabase.table("products").upsert(data_to_insert).execute()
-        print("📤 Uploaded to Supabase!")
+    asyncio.run(_crawl(source, on_page, max(1, window)))
 
-    return all_products
+    print(f"\n✅ Found {queued} total products on Jumia for '{product_name}'")
+    return queued
 
 if __name__ == "__main__":
     product = input("🔎 اكتب اسم المنتج للبحث: ").strip()
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Cross-store product matching: one canonical_id per phone, whichever store listed it.
+
+Titles go through extraction.extract(); the canonical key is
+(brand, model + variant, storage), e.g. ("apple", "13", 128) for both
+"ابل ايفون 13 (128 جيجابايت)" on Amazon and "iPhone 13 128GB" on 2B, and the
+canonical_id is its slug: "apple-13-128gb". A tablet's model starts with its
+marker, so "iPad 11 128GB" is "apple-ipad-11-128gb", never the iPhone 11. Known products sit in a blocking
+index brand -> model -> storage -> canonical_id, so matching a row is a few dict
+lookups instead of a comparison against every title seen so far.
+
+Titles where the extractor finds a brand but no model fall back to fuzzy
+matching inside their brand block: Jaccard similarity of normalized token sets
+against that brand's known products (only those sharing a token, of the same
+device type, with the same storage when both know it). The best score at or above MATCH_MIN_JACCARD wins;
+below that, and for titles with no brand, the row gets no canonical_id.
+
+Products are persisted in SQLite, so later runs (and the other store processes)
+match against everything seen before. products_writer() assigns canonical_id to
+each row just before it is written.
+
+Off by default: rows carry canonical_id only with MATCH_INDEX=1, which needs the
+column on the products table first (see README, Cross-Store Matching); without
+it every insert would fail.
+
+ENV (optional):
+  MATCH_INDEX=1                  enable (rows are written with canonical_id)
+  MATCH_INDEX_PATH=.cache/match_index.sqlite
+  MATCH_MIN_JACCARD=0.5
+"""
+import os, re, time, sqlite3, threading
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from extraction import BRANDS, TABLET_WORDS, PhoneSpec, extract, prepare
+
+DEFAULT_PATH = os.getenv("MATCH_INDEX_PATH", os.path.join(".cache", "match_index.sqlite"))
+DEFAULT_MIN_JACCARD = float(os.getenv("MATCH_MIN_JACCARD", "0.5"))
+
+CanonicalKey = Tuple[str, str, int]   # (brand, model + variant, storage GB; 0 = unknown)
+
+# Words that say nothing about which phone it is (brand tokens are the block itself;
+# tablet markers such as "ipad" stay, they tell a tablet from a phone).
+# Arabic entries are in prepare()'s folded form (ة -> ه, ى -> ي).
+NOISE: FrozenSet[str] = frozenset(
+    {"gb", "tb", "ram", "rom", "5g", "4g", "lte", "dual", "sim", "ds", "smartphone", "phone",
+     "mobile", "with", "and", "the", "for", "new", "version", "warranty", "android", "storage"}
+    | {"موبايل", "جوال", "هاتف", "ذكي", "مع", "من", "في", "علي", "لون", "بلون", "سعه", "بسعه",
+       "تخزين", "ذاكره", "بذاكره", "روم", "شبكه", "يعمل", "بنظام", "اندرويد", "ضمان", "لمده",
+       "عامين", "سنتين", "شريحه", "اتصال", "الاتصال", "شرائح", "الجيل", "الخامس", "الرابع"}
+    | {t for _, tokens in BRANDS for t in tokens if t not in TABLET_WORDS}
+)
+_TABLET_TOKENS = frozenset(TABLET_WORDS)
+_TOKEN_RE = re.compile(r"[^\W_]+\+?")
+
+
+# ---------------- Keys ----------------
+
+def canonical_key(spec: PhoneSpec) -> Optional[CanonicalKey]:
+    """(brand, model, storage) for a spec with both brand and model, else None."""
+    if not (spec.brand and spec.model):
+        return None
+    model = " ".join(spec.full_model.lower().split())
+    return spec.brand, model, spec.storage_gb or 0
+
+
+def canonical_id(key: CanonicalKey) -> str:
+    """Readable slug for a key: ("samsung", "s24 ultra", 256) -> "samsung-s24-ultra-256gb"."""
+    brand, model, storage = key
+    parts = [brand, re.sub(r"[^a-z0-9+]+", "-", model).strip("-")]
+    if storage:
+        parts.append(f"{storage // 1024}tb" if storage >= 1024 and storage % 1024 == 0 else f"{storage}gb")
+    return "-".join(parts)
+
+
+def title_tokens(title: str) -> FrozenSet[str]:
+    """Normalized token set used for fuzzy matching (no noise words or capacities)."""
+    words = _TOKEN_RE.findall(prepare(title))
+    return frozenset(w for w in words if w not in NOISE and not (w.isdigit() and len(w) >= 3))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+# ---------------- Index ----------------
+
+class ProductMatcher:
+    """Blocking index of canonical products, persisted in SQLite. Thread-safe."""
+
+    def __init__(self, path: str = DEFAULT_PATH, min_jaccard: float = DEFAULT_MIN_JACCARD):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self.min_jaccard = min_jaccard
+        self._lock = threading.Lock()
+        # brand -> model -> storage -> canonical_id
+        self._block: Dict[str, Dict[str, Dict[int, str]]] = {}
+        # canonical_id -> (brand, storage, tokens); brand -> token -> ids (fuzzy candidates)
+        self._products: Dict[str, Tuple[str, int, FrozenSet[str]]] = {}
+        self._postings: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        self.exact = self.fuzzy = self.unmatched = 0
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS canonical_products (
+                id TEXT PRIMARY KEY,
+                brand TEXT NOT NULL,
+                model TEXT NOT NULL,
+                storage_gb INTEGER NOT NULL,
+                tokens TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )""")
+        self._db.commit()
+        for pid, brand, model, storage, tokens in self._db.execute(
+                "SELECT id, brand, model, storage_gb, tokens FROM canonical_products"):
+            self._add((brand, model, storage), pid, frozenset(tokens.split()))
+
+    def _add(self, key: CanonicalKey, pid: str, tokens: FrozenSet[str]):
+        brand, model, storage = key
+        self._block.setdefault(brand, {}).setdefault(model, {})[storage] = pid
+        self._products[pid] = (brand, storage, tokens)
+        postings = self._postings[brand]
+        for tok in tokens:
+            postings[tok].add(pid)
+
+    def _lookup(self, key: CanonicalKey) -> Optional[str]:
+        brand, model, storage = key
+        return self._block.get(brand, {}).get(model, {}).get(storage)
+
+    def _fuzzy(self, spec: PhoneSpec, tokens: FrozenSet[str]) -> Optional[str]:
+        postings = self._postings.get(spec.brand)
+        if not postings or not tokens:
+            return None
+        candidates: Set[str] = set()
+        for tok in tokens:
+            candidates |= postings.get(tok, set())
+        best, best_score = None, self.min_jaccard
+        for pid in sorted(candidates):
+            _, storage, ptokens = self._products[pid]
+            if spec.storage_gb and storage and storage != spec.storage_gb:
+                continue
+            if bool(ptokens & _TABLET_TOKENS) != spec.tablet:   # phone vs tablet
+                continue
+            score = jaccard(tokens, ptokens)
+            if score >= best_score:
+                best, best_score = pid, score
+        return best
+
+    def _match(self, title: str, new: List[Tuple]) -> Optional[str]:
+        spec = extract(title)
+        key = canonical_key(spec)
+        if key is not None:
+            pid = self._lookup(key)
+            if pid is None:
+                pid, tokens = canonical_id(key), title_tokens(title)
+                self._add(key, pid, tokens)
+                new.append((pid, *key, " ".join(sorted(tokens)), time.time()))
+            self.exact += 1
+            return pid
+        if spec.brand:
+            pid = self._fuzzy(spec, title_tokens(title))
+            if pid is not None:
+                self.fuzzy += 1
+                return pid
+        self.unmatched += 1
+        return None
+
+    def _save(self, new: List[Tuple]):
+        if new:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO canonical_products (id, brand, model, storage_gb, tokens, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", new)
+            self._db.commit()
+
+    # ---- public API ----
+    def match(self, title: str) -> Optional[str]:
+        """canonical_id for one title (registering it as a new product if needed)."""
+        new: List[Tuple] = []
+        with self._lock:
+            pid = self._match(title or "", new)
+            self._save(new)
+        return pid
+
+    def assign(self, rows: Sequence[Dict]) -> int:
+        """Set row["canonical_id"] on every row in place; returns how many matched."""
+        new: List[Tuple] = []
+        matched = 0
+        with self._lock:
+            for row in rows:
+                pid = self._match(row.get("raw_title") or row.get("title") or "", new)
+                row["canonical_id"] = pid
+                matched += pid is not None
+            self._save(new)
+        return matched
+
+    def products(self, brand: Optional[str] = None) -> Iterable[str]:
+        """Known canonical_ids (of one brand)."""
+        return sorted(pid for pid, (b, _, _) in self._products.items() if brand in (None, b))
+
+    def summary(self) -> str:
+        return (f"🔗 matched {self.exact} exact, {self.fuzzy} fuzzy, {self.unmatched} unmatched "
+                f"({len(self._products)} canonical products)")
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_MATCHER: Optional[ProductMatcher] = None
+_MATCHER_LOCK = threading.Lock()
+
+
+def get_matcher() -> Optional[ProductMatcher]:
+    """Process-wide matcher shared by all writers when MATCH_INDEX is on, else None."""
+    global _MATCHER
+    if os.getenv("MATCH_INDEX", "0").strip() not in ("1", "true", "yes", "on"):
+        return None
+    with _MATCHER_LOCK:
+        if _MATCHER is None:
+            _MATCHER = ProductMatcher()
+        return _MATCHER
@@ -1,11 +1,16 @@
-import requests
-from bs4 import BeautifulSoup
-import time
+from html_parser import parse_html, NOON_RESULTS
 import random
 import re
-import csv
+import json
+import asyncio
 from supabase import create_client, Client
 import os, sys
+from fetch import FetchEngine
+from sessions import get_session, describe
+from supabase_writer import products_writer
+from textmatch import TermMatcher
+from textnorm import normalize_arabic
+from extraction import noon_columns
 
 # ---------------- Supabase Setup ----------------
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -16,14 +21,7 @@ if not SUPABASE_URL or not SUPABASE_KEY:
              "Add repo secrets and map them via env in the workflow.")
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-# ---------------- Normalize Arabic ----------------
-def normalize_arabic(text):
-    text = re.sub(r"[إأآا]", "ا", text)
-    text = re.sub(r"[ى]", "ي", text)
-    text = re.sub(r"[ة]", "ه", text)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+writer = products_writer(supabase, "noon", mode="insert")
 
 # ---------------- Accessory Filter ----------------
 ACCESSORY_KEYWORDS = [
@@ -33,81 +31,18 @@ ACCESSORY_KEYWORDS = [
     "screen", "tpu", "silicone", "shock", "clear", "camera",
     "wallet", "flip", "back", "shell", "skin", "pouch", "armor"
 ]
+ACCESSORY_MATCHER = TermMatcher(ACCESSORY_KEYWORDS)
 
 def is_accessory(title):
-    title_norm = normalize_arabic(title).lower()
-    return any(keyword.lower() in title_norm for keyword in ACCESSORY_KEYWORDS)
+    return ACCESSORY_MATCHER.matches(title)
 
 # ---------------- Brand Detection ----------------
 def extract_brand_or_model(title):
-    title_norm = normalize_arabic(title.lower())
-
-    if "ايباد" in title_norm or "ipad" in title_norm:
-        return "ايباد"
-
-    if ("ايفون" in title_norm or "iphone" in title_norm) and "كابل" not in title_norm:
-        return "ايفون"
-
-    if "ابل" in title_norm and ("iphone" in title_norm or "ايفون" in title_norm):
-        return "ايفون"
-
-    if "شاومي" in title_norm and ("ريدمي" in title_norm or "redmi" in title_norm):
-        return "ريدمي"
-
-    if "شاومي" in title_norm and ("poco" in title_norm or "بوكو" in title_norm):
-        return "بوكو"
-
-    if "بوكو" in title_norm or "poco" in title_norm:
-        return "بوكو"
-
-    if "ريدمي" in title_norm or "redmi" in title_norm:
-        return "ريدمي"
-
-    if "ريلمي" in title_norm or "ريل مي" in title_norm or "realme" in title_norm:
-        return "ريلمي"
-
-    if re.search(r"\bابل\b", title_norm) and "كابل" not in title_norm:
-        return "Apple"
-
-    brand_map = {
-        "سامسونج": "سامسونج", "samsung": "Samsung",
-        "هواوي": "هواوي", "huawei": "Huawei",
-        "شاومي": "شاومي", "xiaomi": "Xiaomi",
-        "اوبو": "اوبو", "oppo": "Oppo",
-        "فيفو": "فيفو", "vivo": "Vivo",
-        "نوكيا": "نوكيا", "nokia": "Nokia",
-        "سوني": "سوني", "sony": "Sony",
-        "جوجل": "جوجل", "google": "Google Pixel",
-        "موتورولا": "موتورولا", "motorola": "Motorola",
-        "ون بلس": "ون بلس", "oneplus": "OnePlus",
-        "ال جي": "ال جي", "lg": "LG"
-    }
-
-    for keyword, brand in brand_map.items():
-        if keyword in title_norm:
-            return brand
-
-    return "Unknown"
+    return noon_columns(title)[0]
 
 # ---------------- Model and Suffix Extraction ----------------
 def extract_model_and_suffix(title):
-    title = normalize_arabic(title)
-    suffix = ""
-
-    suffix_match = re.search(r"\b(pro\+?|برو)\b", title, re.IGNORECASE)
-    if suffix_match:
-        suffix = suffix_match.group(1).capitalize()
-
-    model_match = re.search(r"(?:ريلمي|realme).*?(\d{2})", title, re.IGNORECASE)
-    if model_match:
-        model = model_match.group(1)
-        return model, suffix
-
-    fallback = re.search(r"\b([a-zA-Z]{1,2}\d{1,3}[a-zA-Z+]{0,4})\b", title, re.IGNORECASE)
-    if fallback:
-        return fallback.group(1).upper(), suffix
-
-    return None, suffix
+    return noon_columns(title)[1:]
 
 # ---------------- Scraper Settings ----------------
 HEADERS = {
@@ -120,33 +55,108 @@ HEADERS = {
     "Accept-Language": "ar-EG,ar;q=0.9"
 }
 
+KEYWORDS = [
+    "iphone", "samsung", "xiaomi", "oppo", "huawei",
+    "realme", "vivo", "oneplus", "poco", "nokia", "sony", "lg"
+]
+
 def build_noon_ar_search_url(keyword):
     encoded = keyword.replace(" ", "%20")
     return f"https://www.noon.com/egypt-ar/search?q={encoded}"
 
-# ---------------- Main Scraper ----------------
-def get_noon_ar_products(keyword):
-    url = build_noon_ar_search_url(keyword)
-    print(f"[🔍] جاري البحث عن '{keyword}' في نون...")
+CONCURRENCY = 2          # keywords in flight against noon.com at once
+START_RATE = 0.35        # req/s to start with; adapts to how noon.com answers (ratelimit.py)
 
-    time.sleep(random.uniform(2, 5))
+# ---------------- Embedded product JSON ----------------
+# Search pages are server-rendered by Next.js; the result grid is also in the
+# __NEXT_DATA__ script as JSON, which keeps each title, price and link together.
+NEXT_DATA_RE = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+PRODUCT_BASE_URL = "https://www.noon.com/egypt-ar"
 
+def extract_next_data(html):
+    m = NEXT_DATA_RE.search(html)
+    if not m:
+        return None
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        return json.loads(m.group(1))
+    except ValueError:
+        return None
+
+def _number(value):
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+def _is_hit(node):
+    return (isinstance(node.get("name"), str) and (node.get("sku") or node.get("url"))
+            and (_number(node.get("sale_price")) or _number(node.get("price"))))
+
+def iter_product_hits(data):
+    """Walk the page JSON and yield every product hit (dict with name, price, sku/url)."""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if _is_hit(node):
+                yield node
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+def hit_to_item(hit):
+    price = _number(hit.get("sale_price")) or _number(hit.get("price"))
+    sku = hit.get("sku") or ""
+    url = hit.get("url") or ""
+    link = f"{PRODUCT_BASE_URL}/{url}/{sku}/p/" if url and sku else None
+    return {
+        "title": hit["name"].strip(),
+        "price": price,
+        "link": link,
+        "sku": sku,   # dedupe key only; the products table has no column for it
+    }
+
+def extract_noon_items(html):
+    """Products from the embedded JSON, deduped by sku; None if the page has no JSON."""
+    data = extract_next_data(html)
+    if data is None:
+        return None
+    items, seen = [], set()
+    for hit in iter_product_hits(data):
+        item = hit_to_item(hit)
+        key = item["sku"] or item["title"]
+        if key in seen:
+            continue
+        seen.add(key)
+        items.append(item)
+    return items
+
+def extract_noon_items_dom(html):
+    # Fallback for pages without the JSON blob; title/price pairing is positional
+    soup = parse_html(html, only=NOON_RESULTS)
+    titles = soup.find_all("h2", {"class": "ProductDetailsSection_title__JorAV"})
+    prices = soup.find_all("strong", {"class": "Price_amount__2sXa7"})
+    return [{"title": t.text.strip(),
+             "price": float(re.sub(r"[^\d.]", "", p.text.strip().replace(",", ""))),
+             "link": None}
+            for t, p in zip(titles, prices)]
 
-        titles = soup.find_all("h2", {"class": "ProductDetailsSection_title__JorAV"})
-        prices = soup.find_all("strong", {"class": "Price_amount__2sXa7"})
+# ---------------- Main Scraper ----------------
+def parse_noon_ar_products(html, keyword):
+    try:
+        items = extract_noon_items(html)
+        if not items:
+            print(f"[noon] '{keyword}': no embedded product JSON, reading the DOM")
+            items = extract_noon_items_dom(html)
 
         products = []
-        for title_tag, price_tag in zip(titles, prices):
-            title = title_tag.text.strip()
+        for item in items:
+            title = item["title"]
             normalized_title = normalize_arabic(title)
+            clean_price = item["price"]
 
-            raw_price = price_tag.text.strip()
-            clean_price = float(re.sub(r"[^\d.]", "", raw_price.replace(",", "")))
-
-            if is_accessory(normalized_title):
+            if not clean_price or is_accessory(normalized_title):
                 continue
 
             brand = extract_brand_or_model(normalized_title)
@@ -160,14 +170,12 @@ def get_noon_ar_products(keyword):
                 "query": keyword,
                 "brand_or_model": brand,
                 "model": model,
-                "suffix": suffix
+                "suffix": suffix,
+                "link": item.get("link")
             }
 
-            try:
-                supabase.table("products").insert(product).execute()
-                print(f"✅ Uploaded: {title[:40]}... - {clean_price} EGP")
-            except Exception as e:
-                print(f"[!] Supabase insert failed: {e}")
+            writer.add(product)
+            print(f"✅ Queued: {title[:40]}... - {clean_price} EGP")
 
             products.append(product)
 
@@ -177,21 +185,54 @@ def get_noon_ar_products(keyword):
         print(f"[❌] خطأ أثناء جلب البيانات: {e}")
         return []
 
-# ---------------- Main Runner ----------------
-if __name__ == "__main__":
-    keywords = [
-        "iphone", "samsung", "xiaomi", "oppo", "huawei",
-        "realme", "vivo", "oneplus", "poco", "nokia", "sony", "lg"
-    ]
+async def _search_keyword(engine, keyword, keep=None):
+    print(f"[🔍] جاري البحث عن '{keyword}' في نون...")
+    html = await engine.fetch(build_noon_ar_search_url(keyword))
+    if html is None:
+        print(f"[❌] خطأ أثناء جلب البيانات: '{keyword}'")
+        return 0
+    products = await asyncio.to_thread(parse_noon_ar_products, html, keyword)
+    if keep is not None:
+        keep.extend(products)
+    return len(products)
+
+def stream_noon_ar_products(keywords, concurrency=CONCURRENCY, keep=None):
+    """Search many keywords concurrently (politely paced per host).
+
+    Products stream to the writer per keyword and are not collected (unless a
+    `keep` list is given); returns how many were queued.
+    """
+    session = get_session("noon", headers=HEADERS)
+
+    async def _run():
+        engine = FetchEngine(session, per_host=concurrency, rate=START_RATE, timeout=15)
+        try:
+            results = await asyncio.gather(*(_search_keyword(engine, kw, keep) for kw in keywords))
+        finally:
+            engine.close()
+        return sum(results)
+
+    queued = asyncio.run(_run())
+    writer.flush()
+    print(writer.summary())
+    print(describe("noon"))
+    return queued
+
+def get_noon_ar_products_many(keywords, concurrency=CONCURRENCY):
+    """Same as stream_noon_ar_products(), but returns the products as a list."""
+    products = []
+    stream_noon_ar_products(keywords, concurrency, keep=products)
+    return products
 
-    all_products = []
+def get_noon_ar_products(keyword):
+    return get_noon_ar_products_many([keyword])
 
-    for keyword in keywords:
-        print(f"\n=== 🔎 البحث عن: {keyword} ===")
-        products = get_noon_ar_products(keyword)
-        all_products.extend(products)
+# ---------------- Main Runner ----------------
+if __name__ == "__main__":
+    print(f"\n=== 🔎 البحث عن: {', '.join(KEYWORDS)} ===")
+    total = stream_noon_ar_products(KEYWORDS)
 
-    print(f"\n✅ Total products uploaded: {len(all_products)}")
+    print(f"\n✅ Total products uploaded: {total}")
 
 
 
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Local last-seen price index for change-only Supabase writes.
+
+Every row written to `products` is remembered in a small SQLite file, keyed by
+(store, link) — or (store, title) for stores without links (Jumia, B.TECH) —
+together with its price and a hash of its content. On the next run only rows
+that are new, changed, or older than PRICE_INDEX_MAX_AGE_DAYS are sent; the rest
+are skipped and counted in the writer summary.
+
+ENV (optional):
+  PRICE_INDEX_PATH=.cache/price_index.sqlite
+  PRICE_INDEX_MAX_AGE_DAYS=7     re-send unchanged rows after this many days
+  PRICE_INDEX=0                  disable (write every row, as before)
+"""
+import os, json, time, sqlite3, hashlib, threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_PATH = os.getenv("PRICE_INDEX_PATH", os.path.join(".cache", "price_index.sqlite"))
+DEFAULT_MAX_AGE_DAYS = float(os.getenv("PRICE_INDEX_MAX_AGE_DAYS", "7"))
+
+# Fields that change between runs without the product changing
+VOLATILE_FIELDS = {"query", "scraped_at", "origin", "__query"}
+
+
+def row_key(row: Dict) -> Tuple[str, str]:
+    store = str(row.get("store") or "")
+    return store, str(row.get("link") or row.get("title") or "")
+
+
+def content_hash(row: Dict) -> str:
+    payload = {k: v for k, v in row.items() if k not in VOLATILE_FIELDS}
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class PriceIndex:
+    """(store, key) -> last written price + content hash, persisted in SQLite."""
+
+    def __init__(self, path: str = DEFAULT_PATH, max_age_days: float = DEFAULT_MAX_AGE_DAYS):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self.max_age = max_age_days * 86400
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS last_seen (
+                store TEXT NOT NULL,
+                key TEXT NOT NULL,
+                price REAL,
+                hash TEXT NOT NULL,
+                written_at REAL NOT NULL,
+                PRIMARY KEY (store, key)
+            )""")
+        self._db.commit()
+
+    def changed(self, rows: Sequence[Dict]) -> Tuple[List[Dict], int]:
+        """Split rows into (new or changed rows to send, number skipped as unchanged).
+
+        Duplicate keys inside `rows` collapse to the last one.
+        """
+        latest: Dict[Tuple[str, str], Dict] = {}
+        for row in rows:
+            latest[row_key(row)] = row
+        now = time.time()
+        out: List[Dict] = []
+        with self._lock:
+            for key, row in latest.items():
+                hit = self._db.execute(
+                    "SELECT hash, written_at FROM last_seen WHERE store = ? AND key = ?", key
+                ).fetchone()
+                if hit and hit[0] == content_hash(row) and now - hit[1] < self.max_age:
+                    continue
+                out.append(row)
+        return out, len(rows) - len(out)
+
+    def record(self, rows: Sequence[Dict]):
+        """Remember rows that were written successfully."""
+        now = time.time()
+        data = [(*row_key(r), r.get("price"), content_hash(r), now) for r in rows]
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO last_seen (store, key, price, hash, written_at) "
+                "VALUES (?, ?, ?, ?, ?)", data)
+            self._db.commit()
+
+    def last_price(self, store: str, key: str) -> Optional[float]:
+        with self._lock:
+            hit = self._db.execute(
+                "SELECT price FROM last_seen WHERE store = ? AND key = ?", (store, key)
+            ).fetchone()
+        return hit[0] if hit else None
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_INDEX: Optional[PriceIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_index() -> Optional[PriceIndex]:
+    """Process-wide index shared by all writers, or None when PRICE_INDEX=0."""
+    global _INDEX
+    if os.getenv("PRICE_INDEX", "1").strip() in ("0", "false", "no", "off"):
+        return None
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            _INDEX = PriceIndex()
+        return _INDEX
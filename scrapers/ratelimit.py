@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Adaptive per-host rate limits shared by every fetch in the process.
+
+One HostLimiter per host (amazon.eg, www.noon.com, 2b.com.eg, ...), created on
+first use. Each is a token bucket: requests wait for a token, tokens refill at
+`rate` per second and up to `burst` can be saved up. The rate adapts AIMD-style
+to how the store answers:
+
+- every successful response adds `increase` req/s (up to max_rate);
+- a throttling response (403 / 429 / 503 / Cloudflare 52x, as classified by
+  fetch.py) multiplies the rate by `decrease` (down to min_rate) and makes the
+  next request wait at least one new interval, or the Retry-After the server
+  asked for. Only responses to requests sent after the last decrease count, so
+  a burst of in-flight failures halves the rate once, not once per request.
+
+A store therefore runs as fast as it currently tolerates instead of at a fixed
+worst-case spacing. Stores give their starting rate (limiter_for(url, rate=...)
+or FetchEngine(rate=...)); the first caller for a host sets it.
+
+ENV (optional):
+  SCRAPER_RATE_START=1.0      req/s for hosts whose store gives no starting rate
+  SCRAPER_RATE_MIN=0.05       floor after repeated throttling (one request per 20 s)
+  SCRAPER_RATE_MAX=4          ceiling while everything is 200
+  SCRAPER_RATE_INCREASE=0.05  req/s added per successful response
+  SCRAPER_RATE_DECREASE=0.5   factor applied on a throttling response
+  SCRAPER_RATE_BURST=2        requests that may go out back to back after a pause
+"""
+import os, time, atexit, threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_RATE = float(os.getenv("SCRAPER_RATE_START", "1.0"))
+DEFAULT_MIN_RATE = float(os.getenv("SCRAPER_RATE_MIN", "0.05"))
+DEFAULT_MAX_RATE = float(os.getenv("SCRAPER_RATE_MAX", "4"))
+DEFAULT_INCREASE = float(os.getenv("SCRAPER_RATE_INCREASE", "0.05"))
+DEFAULT_DECREASE = float(os.getenv("SCRAPER_RATE_DECREASE", "0.5"))
+DEFAULT_BURST = int(os.getenv("SCRAPER_RATE_BURST", "2"))
+MAX_RETRY_AFTER = 120.0   # never park a host longer than this on one Retry-After
+
+
+class HostLimiter:
+    """Token bucket with an AIMD-adjusted rate for one host. Thread-safe.
+
+    Kept in virtual-scheduling form: `_tat` is when the bucket would be full
+    again, so acquire() can reserve a slot and sleep outside the lock.
+    """
+
+    def __init__(self, host: str, rate: float = DEFAULT_RATE,
+                 min_rate: float = DEFAULT_MIN_RATE, max_rate: float = DEFAULT_MAX_RATE,
+                 increase: float = DEFAULT_INCREASE, decrease: float = DEFAULT_DECREASE,
+                 burst: int = DEFAULT_BURST):
+        self.host = host
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.rate = min(max(rate, self.min_rate), self.max_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.burst = max(1, burst)
+        self._tat = 0.0
+        self._decreased_at = 0.0
+        self._lock = threading.Lock()
+        self.requests = self.ok = self.throttles = 0
+        self.waited = 0.0
+        self.low = self.high = self.rate
+
+    def _tolerance(self) -> float:
+        return (self.burst - 1) / self.rate
+
+    def acquire(self) -> float:
+        """Wait for a token; returns the (monotonic) time the request may go out."""
+        with self._lock:
+            now = time.monotonic()
+            interval = 1.0 / self.rate
+            tat = max(self._tat, now)
+            start = max(now, tat - self._tolerance())
+            self._tat = tat + interval
+            self.requests += 1
+            self.waited += start - now
+        if start > now:
+            time.sleep(start - now)
+        return start
+
+    def success(self):
+        with self._lock:
+            self.ok += 1
+            self.rate = min(self.max_rate, self.rate + self.increase)
+            self.high = max(self.high, self.rate)
+
+    def throttled(self, sent_at: float, retry_after: Optional[float] = None):
+        """The store pushed back on a request sent at `sent_at` (acquire()'s value)."""
+        with self._lock:
+            now = time.monotonic()
+            self.throttles += 1
+            if sent_at >= self._decreased_at:   # once per round trip
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self.low = min(self.low, self.rate)
+                self._decreased_at = now
+            pause = max(1.0 / self.rate, min(retry_after or 0.0, MAX_RETRY_AFTER))
+            self._tat = max(self._tat, now + pause + self._tolerance())
+
+    def summary(self) -> str:
+        return (f"⏱️ rate {self.host}: {self.rate:.2f} req/s at the end "
+                f"(range {self.low:.2f}–{self.high:.2f}), {self.ok} ok, "
+                f"{self.throttles} throttled, {self.waited:.0f}s waited over {self.requests} requests")
+
+
+_LIMITERS: Dict[str, HostLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def limiter_for(url: str, rate: Optional[float] = None) -> HostLimiter:
+    """The shared limiter for the host of `url`; `rate` only applies when it is created."""
+    host = urlsplit(url).netloc.lower()
+    with _LIMITERS_LOCK:
+        lim = _LIMITERS.get(host)
+        if lim is None:
+            if not _LIMITERS:
+                atexit.register(report)
+            lim = _LIMITERS[host] = HostLimiter(host, DEFAULT_RATE if rate is None else rate)
+        return lim
+
+
+def retry_after(headers) -> Optional[float]:
+    """Seconds from a numeric Retry-After header, if the server sent one."""
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def report():
+    with _LIMITERS_LOCK:
+        limiters = list(_LIMITERS.values())
+    for lim in limiters:
+        if lim.requests:
+            print(lim.summary())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Run all five store scrapers concurrently in one process.
+
+Each store gets its own worker pool (per-store concurrency limit), and all stores
+run side by side, so the nightly wall-clock time is roughly that of the slowest
+store instead of the sum of all five.
+
+ENV expected: same as the individual scrapers (SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY,
+and SCRAPER_PROXY / NO_PROXY for 2B).
+
+Run examples:
+  python scrapers/run_all.py
+  python scrapers/run_all.py --stores amazon,noon --limit amazon=3
+  python scrapers/run_all.py --stores 2b --2b-lang en --2b-max-pages 5
+"""
+import sys, time, argparse, importlib, traceback
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Tuple
+
+from sessions import all_stats, describe
+
+# ---------------- Defaults ----------------
+ALL_STORES = ["amazon", "noon", "jumia", "btech", "2b"]
+
+# Per-store concurrency: requests in flight for the requests-based stores (Amazon,
+# Noon, 2B), parallel queries for the Selenium ones (1 browser each by default).
+DEFAULT_LIMITS = {"amazon": 2, "noon": 2, "jumia": 1, "btech": 1, "2b": 3}
+
+# (product, category) pairs the workflow used to pipe into jumia.py / btech.py
+JUMIA_QUERIES = [("iphone 13", "mobiles")]
+BTECH_QUERIES = [("iphone 13", "mobiles")]
+
+MODULES = {"amazon": "_amazon", "noon": "noon", "jumia": "jumia", "btech": "btech", "2b": "_2b"}
+
+Job = Callable[[], object]
+
+
+# ---------------- Per-store job lists ----------------
+
+# The async stores get one job that fans out internally (limit = requests in
+# flight); the Selenium stores get one job per query (limit = parallel jobs).
+
+def amazon_jobs(mod, args, limit: int) -> List[Job]:
+    category_code = mod.CATEGORY_MAPPING.get("mobiles")
+    return [lambda: mod.stream_products_for_keywords(mod.KEYWORDS, category_code, concurrency=limit)]
+
+
+def noon_jobs(mod, args, limit: int) -> List[Job]:
+    return [lambda: mod.stream_noon_ar_products(mod.KEYWORDS, concurrency=limit)]
+
+
+def jumia_jobs(mod, args, limit: int) -> List[Job]:
+    return [lambda q=q, c=c: mod.search_jumia_fast(q, c) for q, c in JUMIA_QUERIES]
+
+
+def btech_jobs(mod, args, limit: int) -> List[Job]:
+    return [lambda q=q, c=c: mod.search_btech_fixed(q, c) for q, c in BTECH_QUERIES]
+
+
+def twob_jobs(mod, args, limit: int) -> List[Job]:
+    return [lambda: mod.run(lang=args.twob_lang, max_pages=args.twob_max_pages, concurrency=limit)]
+
+
+JOB_BUILDERS = {
+    "amazon": amazon_jobs,
+    "noon": noon_jobs,
+    "jumia": jumia_jobs,
+    "btech": btech_jobs,
+    "2b": twob_jobs,
+}
+
+
+# ---------------- Runner ----------------
+
+def parse_limits(pairs: List[str]) -> Dict[str, int]:
+    limits = dict(DEFAULT_LIMITS)
+    for pair in pairs:
+        store, _, n = pair.partition("=")
+        store = store.strip().lower()
+        if store not in limits or not n.strip().isdigit() or int(n) < 1:
+            raise SystemExit(f"Bad --limit value: {pair!r} (expected store=N, e.g. amazon=3)")
+        limits[store] = int(n)
+    return limits
+
+
+def _run_job(store: str, job: Job) -> Tuple[int, bool]:
+    try:
+        result = job()
+        if isinstance(result, list):
+            return len(result), True
+        return (result if isinstance(result, int) else 0), True
+    except Exception:
+        print(f"[run_all][{store}] job failed:")
+        traceback.print_exc()
+        return 0, False
+
+
+def run_stores(stores: List[str], limits: Dict[str, int], args) -> Dict[str, Dict]:
+    # Import in the main thread so module-level setup (env checks, chromedriver) runs once.
+    modules = {s: importlib.import_module(MODULES[s]) for s in stores}
+
+    pools = {s: ThreadPoolExecutor(max_workers=limits[s], thread_name_prefix=s) for s in stores}
+    futures = {s: [pools[s].submit(_run_job, s, job) for job in JOB_BUILDERS[s](modules[s], args, limits[s])]
+               for s in stores}
+    started = time.monotonic()
+    finished: Dict[str, float] = {}
+
+    def _mark_done(store: str):
+        def _cb(_):
+            if all(f.done() for f in futures[store]):
+                finished.setdefault(store, time.monotonic() - started)
+        return _cb
+
+    for s in stores:
+        for f in futures[s]:
+            f.add_done_callback(_mark_done(s))
+
+    wait([f for fs in futures.values() for f in fs])
+    for pool in pools.values():
+        pool.shutdown(wait=True)
+
+    summary = {}
+    for s in stores:
+        results = [f.result() for f in futures[s]]
+        summary[s] = {
+            "jobs": len(results),
+            "failed": sum(1 for _, ok in results if not ok),
+            "products": sum(n for n, _ in results),
+            "seconds": round(finished.get(s, time.monotonic() - started), 1),
+        }
+    return summary
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run all store scrapers concurrently.")
+    ap.add_argument("--stores", type=str, default=",".join(ALL_STORES),
+                    help=f"Comma-separated subset of: {', '.join(ALL_STORES)}")
+    ap.add_argument("--limit", action="append", default=[], metavar="STORE=N",
+                    help="Per-store concurrency (repeatable), e.g. --limit amazon=3")
+    ap.add_argument("--2b-lang", dest="twob_lang", choices=["en", "ar"], default="ar")
+    ap.add_argument("--2b-max-pages", dest="twob_max_pages", type=int, default=10)
+    args = ap.parse_args()
+
+    stores = [s.strip().lower() for s in args.stores.split(",") if s.strip()]
+    unknown = [s for s in stores if s not in MODULES]
+    if unknown:
+        raise SystemExit(f"Unknown store(s): {', '.join(unknown)}")
+    limits = parse_limits(args.limit)
+
+    started = time.monotonic()
+    summary = run_stores(stores, limits, args)
+    total = time.monotonic() - started
+
+    print("\n=== run_all summary ===")
+    for s, info in summary.items():
+        print(f"{s:>7}: {info['products']} products, {info['jobs']} jobs "
+              f"({info['failed']} failed) in {info['seconds']}s")
+    for name in all_stats():
+        print(describe(name))
+    print(f"Wall clock: {total:.1f}s")
+
+    if any(info["failed"] for info in summary.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Pooled HTTP sessions shared by all scrapers.
+
+One requests.Session per name (usually one per store), created on first use and
+reused for the whole run: keep-alive connections, a tunable urllib3 pool and a
+cookie jar that persists across pages and keywords. Each session counts requests
+against newly opened TCP/TLS connections so a run can report connection reuse.
+
+ENV (optional):
+  SCRAPER_POOL_CONNECTIONS=4   hosts whose pools are cached per session
+  SCRAPER_POOL_MAXSIZE=10      keep-alive connections kept per host
+"""
+import os, threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_CONNECTIONS = int(os.getenv("SCRAPER_POOL_CONNECTIONS", "4"))
+DEFAULT_POOL_MAXSIZE = int(os.getenv("SCRAPER_POOL_MAXSIZE", "10"))
+
+_SESSIONS: Dict[str, requests.Session] = {}
+_LOCK = threading.Lock()
+
+
+class CountingAdapter(HTTPAdapter):
+    """HTTPAdapter that remembers the urllib3 pools it used, for reuse stats."""
+
+    def __init__(self, *args, **kwargs):
+        self._seen_pools = {}
+        self._seen_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        resp = super().send(request, **kwargs)
+        pool = getattr(resp.raw, "_pool", None)
+        if pool is not None:
+            with self._seen_lock:
+                self._seen_pools[id(pool)] = pool
+        return resp
+
+    def stats(self) -> Dict[str, int]:
+        with self._seen_lock:
+            pools = list(self._seen_pools.values())
+        reqs = sum(getattr(p, "num_requests", 0) for p in pools)
+        conns = sum(getattr(p, "num_connections", 0) for p in pools)
+        return {"requests": reqs, "connections": conns, "reused": max(reqs - conns, 0)}
+
+
+def get_session(name: str, headers: Optional[Dict[str, str]] = None,
+                proxies: Optional[Dict[str, str]] = None,
+                pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                pool_maxsize: int = DEFAULT_POOL_MAXSIZE) -> requests.Session:
+    """Return the shared session for `name`, creating it on first call.
+
+    headers/proxies/pool sizes only apply when the session is created; later calls
+    get the same session (and its cookies) back unchanged.
+    """
+    with _LOCK:
+        s = _SESSIONS.get(name)
+        if s is not None:
+            return s
+        s = requests.Session()
+        adapter = CountingAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        s.headers.update({"Connection": "keep-alive"})
+        if headers:
+            s.headers.update(headers)
+        if proxies:
+            s.proxies.update(proxies)
+        _SESSIONS[name] = s
+        return s
+
+
+def session_stats(name: str) -> Optional[Dict[str, int]]:
+    s = _SESSIONS.get(name)
+    if s is None:
+        return None
+    adapter = s.get_adapter("https://")
+    return adapter.stats() if isinstance(adapter, CountingAdapter) else None
+
+
+def describe(name: str) -> str:
+    st = session_stats(name)
+    if not st:
+        return f"[{name}] no HTTP session"
+    return (f"[{name}] HTTP: {st['requests']} requests over {st['connections']} connections "
+            f"({st['reused']} reused)")
+
+
+def all_stats() -> Dict[str, Dict[str, int]]:
+    return {name: session_stats(name) for name in list(_SESSIONS)}
+
+
+def close_sessions():
+    with _LOCK:
+        for s in _SESSIONS.values():
+            s.close()
+        _SESSIONS.clear()
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming row sinks: CSV and JSON Lines written as rows are produced.
+
+Rows are written straight to an open file and flushed every `flush_every` rows
+(and on close), so nothing has to collect a whole run in a list before saving it.
+Peak memory stays flat however many keywords, pages or stores are crawled, and a
+crashed run still leaves everything up to the last flush on disk.
+
+- CsvSink: fixed columns (given, or the first row's keys); missing values are
+  blank, extra keys ignored.
+- JsonlSink: one JSON object per line, all keys kept.
+- JsonArraySink: one JSON array, as json.dump(rows, indent=2) writes it; the
+  closing "]" is written on close.
+- MultiSink: fan one stream out to several sinks.
+
+Every store can export this way: products_writer() attaches export_sink(store)
+to its writer when SCRAPER_EXPORT_DIR is set (writing <dir>/<store>.csv and
+<dir>/<store>.jsonl), and 2B always streams its own CSV / JSONL files.
+
+ENV (optional):
+  SCRAPER_EXPORT_DIR=exports     per-store CSV + JSONL exports from the writers
+  SCRAPER_EXPORT_FLUSH=200       rows between flushes to disk
+"""
+import os, re, csv, json, atexit, threading
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_FLUSH_EVERY = int(os.getenv("SCRAPER_EXPORT_FLUSH", "200"))
+
+# Columns of the products table, in the order the stores fill them
+PRODUCT_FIELDS = ["store", "title", "price", "link", "category", "query",
+                  "brand_or_model", "model", "suffix", "canonical_id"]
+
+
+class RowSink:
+    """Base for streaming sinks: add()/extend() rows, flush(), close(). Thread-safe."""
+
+    def __init__(self, path: str, flush_every: int = DEFAULT_FLUSH_EVERY):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self.count = 0
+        self._unflushed = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._closed = False
+        atexit.register(self.close)
+
+    def add(self, row: Dict):
+        self.extend([row])
+
+    def extend(self, rows: Sequence[Dict]):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"sink {self.path} is closed")
+            for row in rows:
+                self._write(row)
+            self.count += len(rows)
+            self._unflushed += len(rows)
+            if self._unflushed >= self.flush_every:
+                self._file.flush()
+                self._unflushed = 0
+
+    def flush(self):
+        with self._lock:
+            if not self._closed:
+                self._file.flush()
+                self._unflushed = 0
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._finish()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, row: Dict):
+        raise NotImplementedError
+
+    def _finish(self):
+        """Anything the format needs after the last row (called once, before the file closes)."""
+
+
+class CsvSink(RowSink):
+    def __init__(self, path: str, fields: Optional[Sequence[str]] = None,
+                 flush_every: int = DEFAULT_FLUSH_EVERY):
+        super().__init__(path, flush_every)
+        self.fields: Optional[List[str]] = list(fields) if fields else None
+        self._csv: Optional[csv.DictWriter] = None
+
+    def _write(self, row: Dict):
+        if self._csv is None:
+            self.fields = self.fields or list(row)
+            self._csv = csv.DictWriter(self._file, fieldnames=self.fields, restval="", extrasaction="ignore")
+            self._csv.writeheader()
+        self._csv.writerow({k: ("" if row.get(k) is None else row.get(k)) for k in self.fields})
+
+
+class JsonlSink(RowSink):
+    def _write(self, row: Dict):
+        self._file.write(json.dumps(row, ensure_ascii=False, default=str))
+        self._file.write("\n")
+
+
+class JsonArraySink(RowSink):
+    def __init__(self, path: str, flush_every: int = DEFAULT_FLUSH_EVERY):
+        super().__init__(path, flush_every)
+        self._started = False
+
+    def _write(self, row: Dict):
+        item = json.dumps(row, ensure_ascii=False, indent=2, default=str).replace("\n", "\n  ")
+        self._file.write((",\n  " if self._started else "[\n  ") + item)
+        self._started = True
+
+    def _finish(self):
+        self._file.write("\n]" if self._started else "[]")
+
+
+class MultiSink:
+    """Same rows to several sinks (e.g. CSV + JSONL)."""
+
+    def __init__(self, *sinks: RowSink):
+        self.sinks = list(sinks)
+
+    @property
+    def count(self) -> int:
+        return self.sinks[0].count if self.sinks else 0
+
+    @property
+    def paths(self) -> List[str]:
+        return [s.path for s in self.sinks]
+
+    def add(self, row: Dict):
+        self.extend([row])
+
+    def extend(self, rows: Sequence[Dict]):
+        for s in self.sinks:
+            s.extend(rows)
+
+    def flush(self):
+        for s in self.sinks:
+            s.flush()
+
+    def close(self):
+        for s in self.sinks:
+            s.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def csv_jsonl_sink(csv_path: str, jsonl_path: str, fields: Optional[Sequence[str]] = None) -> MultiSink:
+    return MultiSink(CsvSink(csv_path, fields), JsonlSink(jsonl_path))
+
+
+def export_sink(label: str) -> Optional[MultiSink]:
+    """<SCRAPER_EXPORT_DIR>/<label>.csv + .jsonl for a store's writer, or None when unset."""
+    root = os.getenv("SCRAPER_EXPORT_DIR", "").strip()
+    if not root:
+        return None
+    name = re.sub(r"[^\w.-]+", "_", label).strip("_").lower() or "products"
+    return csv_jsonl_sink(os.path.join(root, f"{name}.csv"), os.path.join(root, f"{name}.jsonl"),
+                          fields=PRODUCT_FIELDS)
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+Buffered, batched writes to the Supabase `products` table.
+
+Instead of one `.insert(row).execute()` round trip per product, scrapers add rows
+to a BatchWriter which sends them in chunks (500 by default, as 2B always did),
+retries a failed chunk with exponential backoff, and flushes whatever is left
+when the writer is closed or the process exits. close() prints rows/sec.
+
+BackgroundWriter puts a bounded queue and a writer thread in front of a
+BatchWriter, so scrape loops only enqueue rows and never wait on Supabase
+(unless the queue is full, which is the backpressure). products_writer() builds
+the usual background writer for a store.
+
+With a PriceIndex attached (on by default in products_writer), rows whose price
+and content are unchanged since the last successful write are skipped.
+
+With a ProductMatcher attached (products_writer does when MATCH_INDEX=1), every row
+gets a `canonical_id` (matching.py) before it is written, so the same phone
+carries the same id in every store. With a HistoryWriter (history.py, also on by
+default), every row is appended to the local Parquet price history as well,
+including the unchanged ones the index skips, but not rows marked REPLAYED (a
+resumed crawl sending journaled rows again). With a `sink` (sinks.py; set by
+products_writer when SCRAPER_EXPORT_DIR is given) rows are streamed to CSV / JSONL
+files the same way.
+
+ENV (optional):
+  SUPABASE_CHUNK_SIZE=500     rows per request
+  SUPABASE_MAX_RETRIES=3      retries per chunk before it is dropped (and counted)
+  SUPABASE_QUEUE_SIZE=2000    rows buffered between scrapers and the writer thread
+"""
+import os, time, queue, atexit, threading
+from typing import Dict, List, Optional, Sequence
+
+from history import HistoryWriter, get_history
+from matching import ProductMatcher, get_matcher
+from price_index import PriceIndex, get_index
+from sinks import MultiSink, export_sink
+
+DEFAULT_TABLE = os.getenv("SUPABASE_TABLE", "products")
+DEFAULT_CHUNK_SIZE = int(os.getenv("SUPABASE_CHUNK_SIZE", "500"))
+DEFAULT_MAX_RETRIES = int(os.getenv("SUPABASE_MAX_RETRIES", "3"))
+DEFAULT_QUEUE_SIZE = int(os.getenv("SUPABASE_QUEUE_SIZE", "2000"))
+REPLAYED = "__replayed"   # row key: already in the history from the run that journaled it
+
+
+class BatchWriter:
+    """Collects rows and writes them to Supabase in chunks.
+
+    mode="insert" or "upsert"; on_conflict / ignore_duplicates are passed through
+    to upsert. With `index`, unchanged rows are dropped before sending and sent rows
+    are recorded after each successful chunk. With `matcher`, canonical_id is set on
+    each row first; with `history` / `sink`, every row is also appended to the local
+    price history / streamed to export files. Thread-safe: several scraping threads may share one writer.
+    """
+
+    def __init__(self, client, table: str = DEFAULT_TABLE, mode: str = "insert",
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff: float = 1.5, on_conflict: Optional[Sequence[str]] = None,
+                 ignore_duplicates: bool = False, label: str = "",
+                 index: Optional[PriceIndex] = None, matcher: Optional[ProductMatcher] = None,
+                 history: Optional[HistoryWriter] = None, sink: Optional[MultiSink] = None):
+        if mode not in ("insert", "upsert"):
+            raise ValueError(f"mode must be 'insert' or 'upsert', got {mode!r}")
+        self.client = client
+        self.table = table
+        self.mode = mode
+        self.chunk_size = max(1, chunk_size)
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.on_conflict = on_conflict
+        self.ignore_duplicates = ignore_duplicates
+        self.label = label or table
+        self.index = index
+        self.matcher = matcher
+        self.history = history
+        self.sink = sink
+        self._buf: List[Dict] = []
+        self._lock = threading.Lock()
+        self._started: Optional[float] = None
+        self._closed = False
+        self.written = 0
+        self.failed = 0
+        self.chunks = 0
+        self.skipped = 0
+        self.matched = 0
+        atexit.register(self.close)
+
+    # ---- public API ----
+    def add(self, row: Dict):
+        self.extend([row])
+
+    def extend(self, rows: Sequence[Dict]):
+        ready: List[List[Dict]] = []
+        with self._lock:
+            if self._started is None:
+                self._started = time.monotonic()
+            self._buf.extend(rows)
+            while len(self._buf) >= self.chunk_size:
+                ready.append(self._buf[:self.chunk_size])
+                del self._buf[:self.chunk_size]
+        for chunk in ready:
+            self._send(chunk)
+
+    def flush(self):
+        with self._lock:
+            chunk, self._buf = self._buf, []
+        for i in range(0, len(chunk), self.chunk_size):
+            self._send(chunk[i:i + self.chunk_size])
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self.flush()
+        if self.sink is not None:
+            self.sink.close()
+        if self._started is not None:
+            print(self.summary())
+
+    def summary(self) -> str:
+        elapsed = max(time.monotonic() - (self._started or time.monotonic()), 1e-6)
+        rate = self.written / elapsed
+        failed = f", {self.failed} failed" if self.failed else ""
+        skipped = f", {self.skipped} unchanged skipped" if self.index is not None else ""
+        matched = f", {self.matched} matched" if self.matcher is not None else ""
+        return (f"📤 [{self.label}] wrote {self.written} rows in {self.chunks} chunks "
+                f"({rate:.1f} rows/s{matched}{skipped}{failed})")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- internals ----
+    def _request(self, chunk: List[Dict]):
+        table = self.client.table(self.table)
+        if self.mode == "upsert":
+            kwargs = {"ignore_duplicates": self.ignore_duplicates}
+            if self.on_conflict:
+                kwargs["on_conflict"] = ",".join(self.on_conflict)
+            return table.upsert(chunk, **kwargs)
+        return table.insert(chunk)
+
+    def _send(self, chunk: List[Dict]):
+        replayed = {id(r) for r in chunk if r.pop(REPLAYED, False)}
+        if self.matcher is not None and chunk:
+            matched = self.matcher.assign(chunk)
+            with self._lock:
+                self.matched += matched
+        if self.history is not None and len(chunk) > len(replayed):
+            self.history.add([r for r in chunk if id(r) not in replayed] if replayed else chunk)
+        if self.sink is not None and chunk:
+            self.sink.extend(chunk)
+        if self.index is not None and chunk:
+            chunk, skipped = self.index.changed(chunk)
+            with self._lock:
+                self.skipped += skipped
+        if not chunk:
+            return
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._request(chunk).execute()
+                if self.index is not None:
+                    self.index.record(chunk)
+                with self._lock:
+                    self.written += len(chunk)
+                    self.chunks += 1
+                return
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    print(f"[!] [{self.label}] Supabase {self.mode} of {len(chunk)} rows failed: {e}")
+                    with self._lock:
+                        self.failed += len(chunk)
+                    return
+                delay = self.backoff * (2 ** attempt)
+                print(f"[!] [{self.label}] Supabase {self.mode} failed ({e}); retry in {delay:.1f}s")
+                time.sleep(delay)
+
+
+# ---------------- Background pipeline ----------------
+
+_FLUSH = object()
+_STOP = object()
+
+
+class BackgroundWriter:
+    """Bounded queue + writer thread in front of a BatchWriter.
+
+    add()/extend() block only while the queue is full. flush() waits until every
+    queued row has been sent; close() drains, stops the thread and closes the writer.
+    Partial chunks are also flushed after `flush_interval` seconds without new rows.
+    """
+
+    def __init__(self, writer: BatchWriter, max_queue: int = DEFAULT_QUEUE_SIZE,
+                 flush_interval: float = 5.0):
+        self.writer = writer
+        self.flush_interval = flush_interval
+        self._q: "queue.Queue" = queue.Queue(maxsize=max(1, max_queue))
+        self._closed = False
+        self._thread = threading.Thread(target=self._drain, name=f"writer-{writer.label}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add(self, row: Dict):
+        if self._closed:
+            raise RuntimeError(f"[{self.writer.label}] writer is closed")
+        self._q.put(row)
+
+    def extend(self, rows: Sequence[Dict]):
+        for row in rows:
+            self.add(row)
+
+    def flush(self):
+        if self._closed:
+            return
+        self._q.put(_FLUSH)
+        self._q.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._q.put(_STOP)
+        self._thread.join()
+        self.writer.close()
+
+    def summary(self) -> str:
+        return self.writer.summary()
+
+    @property
+    def written(self) -> int:
+        return self.writer.written
+
+    @property
+    def failed(self) -> int:
+        return self.writer.failed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _drain(self):
+        while True:
+            try:
+                item = self._q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self.writer.flush()
+                continue
+            try:
+                if item is _STOP:
+                    self.writer.flush()
+                    return
+                if item is _FLUSH:
+                    self.writer.flush()
+                else:
+                    self.writer.add(item)
+            except Exception as e:
+                print(f"[!] [{self.writer.label}] writer thread error: {e}")
+            finally:
+                self._q.task_done()
+
+
+def products_writer(client, label: str, mode: str = "insert", **kwargs) -> BackgroundWriter:
+    """Background batched, change-only writer for the products table (store scrapers)."""
+    max_queue = kwargs.pop("max_queue", DEFAULT_QUEUE_SIZE)
+    kwargs.setdefault("index", get_index())
+    kwargs.setdefault("matcher", get_matcher())
+    kwargs.setdefault("history", get_history())
+    kwargs.setdefault("sink", export_sink(label))
+    return BackgroundWriter(BatchWriter(client, DEFAULT_TABLE, mode=mode, label=label, **kwargs),
+                            max_queue=max_queue)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-term substring matching for the accessory / not-a-phone filters.
+
+TermMatcher compiles a keyword list once into an Aho–Corasick automaton and
+then finds every keyword occurring in a title in a single pass over the title,
+instead of one `word in title` scan per keyword. Keywords and titles go through
+the same normalization (textnorm: Arabic letter folding, lower case), so
+"آيفون" / "ايفون" or "حماية" / "حمايه" are the same term.
+
+pyahocorasick (C) is used when installed; otherwise an equivalent pure-Python
+automaton is built.
+"""
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from textnorm import normalize_lower
+
+try:
+    import ahocorasick
+except Exception:
+    ahocorasick = None
+
+# Same folding everywhere (textnorm), lower-cased, cached per title
+normalize_text = normalize_lower
+
+
+class _PyAutomaton:
+    """Plain Aho–Corasick: trie transitions, failure links, merged outputs."""
+
+    def __init__(self, words: Iterable[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.out: List[Tuple[str, ...]] = [()]
+        for w in words:
+            s = 0
+            for ch in w:
+                nxt = self.goto[s].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[s][ch] = nxt
+                    self.goto.append({})
+                    self.out.append(())
+                s = nxt
+            self.out[s] += (w,)
+        self.fail = [0] * len(self.goto)
+        todo = deque(self.goto[0].values())
+        while todo:
+            s = todo.popleft()
+            for ch, nxt in self.goto[s].items():
+                todo.append(nxt)
+                f = self.fail[s]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] += self.out[self.fail[nxt]]
+
+    def iter(self, text: str):
+        goto, fail, out = self.goto, self.fail, self.out
+        s = 0
+        for i, ch in enumerate(text):
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            for w in out[s]:
+                yield i, w
+
+
+class TermMatcher:
+    """Compiled keyword set; find_all() returns the (normalized) terms in a title."""
+
+    def __init__(self, terms: Iterable[str], normalize: Callable[[str], str] = normalize_text):
+        self.normalize = normalize
+        self.terms: List[str] = list(dict.fromkeys(t for t in map(normalize, terms) if t))
+        if ahocorasick is not None and self.terms:
+            self._auto = ahocorasick.Automaton()
+            for t in self.terms:
+                self._auto.add_word(t, t)
+            self._auto.make_automaton()
+        else:
+            self._auto = _PyAutomaton(self.terms)
+
+    def _hits(self, text: str, normalized: bool):
+        if not self.terms:
+            return iter(())
+        return (w for _, w in self._auto.iter(text if normalized else self.normalize(text)))
+
+    def find_all(self, text: str, normalized: bool = False) -> List[str]:
+        """Every term found in `text`, once each, in order of where it ends."""
+        return list(dict.fromkeys(self._hits(text, normalized)))
+
+    def search(self, text: str, normalized: bool = False) -> Optional[str]:
+        """First term found in `text`, or None (stops at the first hit)."""
+        return next(self._hits(text, normalized), None)
+
+    def matches(self, text: str, normalized: bool = False) -> bool:
+        return self.search(text, normalized) is not None
+
+    def __len__(self) -> int:
+        return len(self.terms)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Shared title normalization for all stores.
+
+- normalize_arabic(): alef / yaa / taa-marbuta folding, Arabic-Indic digits to
+  0-9 and whitespace collapsing, in one precompiled regex pass.
+- TokenMapper: Arabic -> English token mapping (e.g. "برو ماكس" -> "Pro Max")
+  as one combined alternation instead of one re.sub per map entry.
+
+Results are memoized on the raw string (titles recur across keywords and
+pages), so normalizing the same title twice in a pipeline costs a dict lookup.
+
+Note: str.translate() was measured slower than the regex pass on Arabic
+titles (CPython only has a fast path for ASCII), hence the regex.
+"""
+import re
+from functools import lru_cache
+from typing import Dict
+
+CACHE_SIZE = 16384
+
+FOLD: Dict[str, str] = {"إ": "ا", "أ": "ا", "آ": "ا", "ى": "ي", "ة": "ه"}
+FOLD.update({d: str(i) for i, d in enumerate("٠١٢٣٤٥٦٧٨٩")})   # Arabic-Indic
+FOLD.update({d: str(i) for i, d in enumerate("۰۱۲۳۴۵۶۷۸۹")})   # Extended (Persian)
+
+_FOLD_RE = re.compile("[%s]" % "".join(FOLD))
+
+
+def _fold(m) -> str:
+    return FOLD[m.group()]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_arabic(text: str) -> str:
+    """Fold letter variants and digits, collapse whitespace."""
+    return " ".join(_FOLD_RE.sub(_fold, text or "").split())
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_lower(text: str) -> str:
+    """normalize_arabic() + lower case (the form keyword matching uses)."""
+    return normalize_arabic(text).lower()
+
+
+class TokenMapper:
+    """Replace every key of `mapping` (case-insensitive) in one regex pass.
+
+    Longer keys win over their prefixes ("برو ماكس" before "برو"), which is what
+    applying the entries one by one in map order did. With whole_words=True a key
+    only matches as a separate word ("ابل" in "ابل ايفون", not in "قابل").
+    """
+
+    def __init__(self, mapping: Dict[str, str], normalize_keys: bool = True,
+                 whole_words: bool = False):
+        self.mapping = {(normalize_arabic(k) if normalize_keys else k).lower(): v
+                        for k, v in mapping.items()}
+        keys = sorted(self.mapping, key=len, reverse=True)
+        pattern = "|".join(map(re.escape, keys))
+        if whole_words:
+            # not glued to other letters; digits may touch ("256جيجا")
+            pattern = rf"(?<![^\W\d_])(?:{pattern})(?![^\W\d_])"
+        self._re = re.compile(pattern, re.IGNORECASE) if keys else None
+        self._cached = lru_cache(maxsize=CACHE_SIZE)(self._apply)
+
+    def _apply(self, text: str) -> str:
+        if not text or self._re is None:
+            return text or ""
+        return self._re.sub(lambda m: self.mapping[m.group().lower()], text)
+
+    def __call__(self, text: str) -> str:
+        return self._cached(text)